@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 import sys
 import traceback
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session
 
 from app.core.dependencies import get_current_user_profile
@@ -192,11 +192,16 @@ def send_like(
     
     Use this to populate the matches/conversations view.
     
+    **Query Parameters:**
+    - `ids` (optional, repeatable): Only return these matches, e.g. to refresh
+      a few known conversations without fetching the whole list
+    
     **Authentication:** Bearer token required.
 
     **Example Request:**
     ```
     GET /api/v1/matches
+    GET /api/v1/matches?ids=match-id-1&ids=match-id-2
     Authorization: Bearer <token>
     ```
     
@@ -247,11 +252,12 @@ def send_like(
     },
 )
 def list_matches(
+    ids: list[str] | None = Query(None, description="Only return matches with these IDs"),
     profile: Profile = Depends(get_current_user_profile),
     session: Session = Depends(get_session),
 ) -> list[MatchRecord]:
-    """List all matches for the authenticated user."""
-    return matching_service.list_matches(session, profile.id)
+    """List matches for the authenticated user, optionally filtered by match ID."""
+    return matching_service.list_matches(session, profile.id, ids=ids)
 
 
 @router.post(
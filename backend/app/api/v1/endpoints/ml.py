@@ -418,8 +418,9 @@ def compute_batch_similarity(
         if not all_texts:
             return BatchSimilarityResponse(results=[])
         
-        # Generate embeddings in batch
-        embeddings = embedding_service.embed_batch(all_texts)
+        # Embed each unique text once; the vectors never leave the server,
+        # so keep them as a float32 array rather than converting to lists
+        embeddings = embedding_service.embed_batch_np(all_texts)
         
         # Compute similarities
         results = []
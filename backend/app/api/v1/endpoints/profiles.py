@@ -3,10 +3,11 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlmodel import Session
 
+from app.core.config import settings
 from app.core.exceptions import NotFoundError
 from app.core.dependencies import get_current_user, get_optional_user
 from app.db.session import get_session
@@ -18,6 +19,14 @@ from app.services.profile_cache import profile_cache_service
 router = APIRouter()
 
 
+def _schedule_embedding_refresh(background_tasks: BackgroundTasks, base_profile: BaseProfile) -> None:
+    """Re-embed a written profile after the response is sent, so ranking finds it cached."""
+    if not settings.ml_enabled:
+        return
+    from app.services.ml.embeddings import precompute_profile_embedding
+    background_tasks.add_task(precompute_profile_embedding, base_profile.model_dump())
+
+
 @router.post(
     "",
     response_model=BaseProfile,
@@ -42,6 +51,7 @@ router = APIRouter()
 # TODO: Re-implement with middleware-based rate limiting or fix slowapi integration
 def create_profile(
     payload: ProfileCreate,  # Body parameter
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     user: Optional[User] = Depends(get_optional_user),
 ) -> BaseProfile:
@@ -76,6 +86,7 @@ def create_profile(
                 base_profile = profile_cache_service._profile_to_base(existing_profile)
                 from app.core.cache import CACHE_TTL_LONG, cache_service
                 cache_service.set(cache_service.get_profile_key(existing_profile.id), base_profile.model_dump(), CACHE_TTL_LONG)
+                _schedule_embedding_refresh(background_tasks, base_profile)
                 
                 return base_profile
         
@@ -103,6 +114,7 @@ def create_profile(
             base_profile = profile_cache_service._profile_to_base(profile_by_email)
             from app.core.cache import CACHE_TTL_LONG, cache_service
             cache_service.set(cache_service.get_profile_key(profile_by_email.id), base_profile.model_dump(), CACHE_TTL_LONG)
+            _schedule_embedding_refresh(background_tasks, base_profile)
             
             return base_profile
     
@@ -134,6 +146,7 @@ def create_profile(
     base_profile = profile_cache_service._profile_to_base(profile)
     from app.core.cache import CACHE_TTL_LONG, cache_service
     cache_service.set(cache_service.get_profile_key(profile.id), base_profile.model_dump(), CACHE_TTL_LONG)
+    _schedule_embedding_refresh(background_tasks, base_profile)
     
     return base_profile
 
@@ -175,6 +188,7 @@ def get_profile(profile_id: str, session: Session = Depends(get_session)) -> Bas
 def update_profile(
     profile_id: str,
     payload: ProfileUpdate,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> BaseProfile:
@@ -201,6 +215,7 @@ def update_profile(
     base_profile = profile_cache_service._profile_to_base(profile)
     from app.core.cache import CACHE_TTL_LONG, cache_service
     cache_service.set(cache_service.get_profile_key(profile.id), base_profile.model_dump(), CACHE_TTL_LONG)
+    _schedule_embedding_refresh(background_tasks, base_profile)
     
     return base_profile
 
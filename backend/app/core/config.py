@@ -42,6 +42,8 @@ class Settings(BaseSettings):
 
     # ML Configuration
     embedding_model: str = "all-MiniLM-L6-v2"  # Sentence transformer model
+    embedding_backend: str = "torch"  # "torch", "onnx" or "openvino" (non-torch needs sentence-transformers[onnx])
+    embedding_model_file: Optional[str] = None  # e.g. "onnx/model_qint8_avx2.onnx" for a quantized ONNX export
     ml_enabled: bool = True  # Enable/disable ML features
     ml_similarity_weight: float = 0.6  # Weight for embedding similarity in ranking
     ml_diligence_weight: float = 0.3  # Weight for diligence scores in ranking
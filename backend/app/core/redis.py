@@ -5,9 +5,11 @@ import redis
 from app.core.config import settings
 
 
-def get_redis_client() -> redis.Redis:
-    return redis.Redis.from_url(settings.redis_url, decode_responses=True)
+def get_redis_client(decode_responses: bool = True) -> redis.Redis:
+    return redis.Redis.from_url(settings.redis_url, decode_responses=decode_responses)
 
 
 redis_client = get_redis_client()
+# Same server, but hands back raw bytes for binary payloads (cached embeddings)
+binary_redis_client = get_redis_client(decode_responses=False)
 
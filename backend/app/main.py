@@ -160,6 +160,16 @@ def create_application() -> FastAPI:
         except Exception as e:
             logger.warning(f"Failed to start WebSocket broadcast worker: {e}")
 
+        # Load the embedding model now so the first ML request doesn't pay for it
+        if settings.ml_enabled:
+            import asyncio
+
+            try:
+                from app.services.ml.embeddings import get_embedding_service
+                await asyncio.to_thread(get_embedding_service)
+            except Exception as e:
+                logger.warning(f"Embedding model warm-up skipped: {e}")
+
         # Run Gale-Shapley stable matching so discovery feed shows stable matches first
         try:
             with Session(engine) as session:
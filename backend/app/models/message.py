@@ -3,11 +3,18 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Thread listing: WHERE match_id = ? ORDER BY created_at
+        Index("ix_messages_match_id_created_at", "match_id", "created_at"),
+        # Mark-as-read: WHERE match_id = ? AND sender_id != ? AND read_at IS NULL
+        Index("ix_messages_match_id_sender_id_read_at", "match_id", "sender_id", "read_at"),
+    )
 
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True, index=True)
     match_id: str = Field(foreign_key="matches.id", index=True)
@@ -4,11 +4,16 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class PromptTemplate(SQLModel, table=True):
     __tablename__ = "prompt_templates"
+    __table_args__ = (
+        # Template listing: WHERE role = ? AND is_active = ? ORDER BY display_order
+        Index("ix_prompt_templates_role_is_active_display_order", "role", "is_active", "display_order"),
+    )
 
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True, index=True)
     text: str = Field(index=True)
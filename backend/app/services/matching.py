@@ -158,12 +158,17 @@ class MatchingService:
                 return None
         return None
 
-    def list_matches(self, session: Session, profile_id: str) -> List[MatchRecord]:
-        results = session.exec(
-            select(Match).where(
-                (Match.founder_id == profile_id) | (Match.investor_id == profile_id)
-            )
-        ).scalars().all()  # Use scalars() to get Match instances, not Row objects
+    def list_matches(
+        self, session: Session, profile_id: str, ids: Optional[List[str]] = None
+    ) -> List[MatchRecord]:
+        """List a profile's matches, optionally narrowed to the given match IDs."""
+        stmt = select(Match).where(
+            (Match.founder_id == profile_id) | (Match.investor_id == profile_id)
+        )
+        if ids:
+            # Filter in SQL rather than fetching every match and scanning in Python
+            stmt = stmt.where(Match.id.in_(ids))
+        results = session.exec(stmt).scalars().all()  # Use scalars() to get Match instances, not Row objects
         # Convert SQLModel Match to Pydantic MatchRecord
         return [
             MatchRecord(
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import func, select, update
 from sqlmodel import Session
 
 from app.models.match import Match
@@ -69,15 +69,16 @@ class MessagingService:
             raise ValueError("User is not part of this match")
 
         # Mark messages as read for this user (only those not sent by them)
-        messages_to_mark = session.exec(
-            select(Message).where(
+        # in one UPDATE instead of loading and flushing each message
+        session.exec(
+            update(Message)
+            .where(
                 Message.match_id == match_id,
                 Message.sender_id != profile_id,
                 Message.read_at.is_(None),
             )
-        ).scalars().all()  # Use scalars() to get Message instances
-        for msg in messages_to_mark:
-            msg.read_at = datetime.utcnow()
+            .values(read_at=datetime.utcnow())
+        )
 
         session.commit()
 
@@ -175,6 +176,56 @@ class MessagingService:
             )
         ).scalars().all()  # Use scalars() to get Match instances
 
+        if not matches:
+            return []
+
+        match_ids = [match.id for match in matches]
+        other_party_ids = {
+            match.investor_id if match.founder_id == profile_id else match.founder_id
+            for match in matches
+        }
+
+        # Batch the per-thread lookups: one query each for the other parties,
+        # the latest message per match, and the unread counts per match
+        other_parties = {
+            profile.id: profile
+            for profile in session.exec(
+                select(Profile).where(Profile.id.in_(other_party_ids))
+            ).scalars().all()
+        }
+
+        latest = (
+            select(
+                Message.match_id,
+                Message.content,
+                Message.created_at,
+                func.row_number()
+                .over(partition_by=Message.match_id, order_by=Message.created_at.desc())
+                .label("rn"),
+            )
+            .where(Message.match_id.in_(match_ids))
+            .subquery()
+        )
+        last_messages = {
+            row.match_id: row
+            for row in session.exec(
+                select(latest.c.match_id, latest.c.content, latest.c.created_at).where(latest.c.rn == 1)
+            ).all()
+        }
+
+        # Count unread messages (messages not sent by user and not read)
+        unread_counts = dict(
+            session.exec(
+                select(Message.match_id, func.count(Message.id))
+                .where(
+                    Message.match_id.in_(match_ids),
+                    Message.sender_id != profile_id,
+                    Message.read_at.is_(None),
+                )
+                .group_by(Message.match_id)
+            ).all()
+        )
+
         threads = []
         for match in matches:
             # Determine the other party
@@ -183,33 +234,14 @@ class MessagingService:
             else:
                 other_party_id = match.founder_id
 
-            other_party = session.get(Profile, other_party_id)
+            other_party = other_parties.get(other_party_id)
             if not other_party:
                 continue
 
-            # Get last message for preview
-            last_message = session.exec(
-                select(Message)
-                .where(Message.match_id == match.id)
-                .order_by(Message.created_at.desc())
-                .limit(1)
-            ).scalars().first()  # Use scalars() to get Message instance
-
-            # Count unread messages (messages not sent by user and not read)
-            unread_result = session.exec(
-                select(func.count(Message.id))
-                .where(
-                    Message.match_id == match.id,
-                    Message.sender_id != profile_id,
-                    Message.read_at.is_(None),
-                )
-            ).scalar()
-            unread_count = int(unread_result) if unread_result is not None else 0
-
-            # Handle last_message safely
-            if last_message and hasattr(last_message, 'content'):
+            last_message = last_messages.get(match.id)
+            if last_message:
                 last_message_preview = last_message.content[:100] if last_message.content else None
-                last_message_at = last_message.created_at if hasattr(last_message, 'created_at') else match.updated_at
+                last_message_at = last_message.created_at
             else:
                 last_message_preview = match.last_message_preview
                 last_message_at = match.updated_at
@@ -224,7 +256,7 @@ class MessagingService:
                     other_party_avatar_url=other_party.avatar_url,
                     last_message_preview=last_message_preview,
                     last_message_at=last_message_at,
-                    unread_count=unread_count,
+                    unread_count=unread_counts.get(match.id, 0),
                     status=match.status,
                 )
             )
@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import logging
+import math
 import os
+import threading
 import warnings
+from collections import OrderedDict
 from typing import List, Optional
 
 # Initialize logger BEFORE trying to use it in exception handler
@@ -31,23 +34,92 @@ except (ImportError, ValueError, Exception) as e:
     SentenceTransformer = None
     torch = None
 
-from app.core.cache import CACHE_TTL_LONG, cache_service
+try:
+    import numpy as np
+except ImportError:
+    # numpy ships with the [ml] extra; the *_np methods need it, the list API doesn't
+    np = None
+
+try:
+    import simsimd
+except ImportError:
+    # Optional SIMD kernels; compute_similarity falls back to numpy without them
+    simsimd = None
+
+from app.core.cache import CACHE_TTL_LONG, CACHE_TTL_VERY_LONG, cache_service
+
+# Output dimension of the default model (all-MiniLM-L6-v2)
+EMBEDDING_DIM = 384
+
+# In-process LRU of recent text embeddings, in front of Redis (~1.5 KB each)
+TEXT_MEMORY_CACHE_SIZE = 10_000
+
+
+def profile_to_text(profile: dict) -> str:
+    """Combine a profile's text fields into the single string that gets embedded.
+    
+    Shared by EmbeddingService.embed_profile_np and the recommendation engine's
+    batch path, so a profile embeds the same way whichever path computes it.
+    """
+    text_parts = []
+    
+    # Basic info
+    for field in ("full_name", "headline", "location"):
+        if profile.get(field):
+            text_parts.append(profile[field])
+    
+    # Prompts (semantic content)
+    prompts = profile.get("prompts", [])
+    if isinstance(prompts, list):
+        text_parts.extend(
+            prompt["content"]
+            for prompt in prompts
+            if isinstance(prompt, dict) and prompt.get("content")
+        )
+    
+    # Role-specific fields
+    role = profile.get("role")
+    if role == "investor":
+        if profile.get("firm"):
+            text_parts.append(profile["firm"])
+        text_parts.extend(profile.get("focus_sectors") or ())
+        text_parts.extend(profile.get("focus_stages") or ())
+    elif role == "founder":
+        if profile.get("company_name"):
+            text_parts.append(profile["company_name"])
+        text_parts.extend(profile.get("focus_markets") or ())
+    
+    return " ".join(text_parts)
 
 
 class EmbeddingService:
     """Service for generating embeddings using sentence transformers."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        backend: str = "torch",
+        model_file: str | None = None,
+    ):
         """Initialize the embedding service.
         
         Args:
             model_name: HuggingFace model name. Default is 'all-MiniLM-L6-v2'
                 (lightweight, fast). Alternatives: 'all-mpnet-base-v2' (better quality),
                 'instructor-xl' (requires custom training).
+            backend: sentence-transformers inference backend: 'torch' (default),
+                'onnx' or 'openvino'. ONNX runs noticeably faster on CPU.
+            model_file: Optional exported model file to load with a non-torch
+                backend, e.g. 'onnx/model_qint8_avx2.onnx' for the INT8 export.
         """
         self.model_name = model_name
+        self.backend = backend
+        self.model_file = model_file
         self.model: Optional[SentenceTransformer] = None
         self.device = "cpu"
+        # (cache_scope, text) -> read-only embedding, most recently used last
+        self._memory_cache: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self._memory_cache_lock = threading.Lock()
         
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             # Only warn if ML is enabled (to reduce noise when ML is intentionally disabled)
@@ -65,13 +137,30 @@ class EmbeddingService:
             elif torch and hasattr(torch.backends, "mps") and torch.backends.mps.is_available():
                 self.device = "mps"  # Apple Silicon
             
-            logger.info(f"Loading sentence transformer model: {model_name} on {self.device}")
-            self.model = SentenceTransformer(model_name, device=self.device)
+            logger.info(f"Loading sentence transformer model: {model_name} ({backend}) on {self.device}")
+            if backend == "torch":
+                self.model = SentenceTransformer(model_name, device=self.device)
+            else:
+                model_kwargs = {"file_name": model_file} if model_file else None
+                self.model = SentenceTransformer(
+                    model_name, device=self.device, backend=backend, model_kwargs=model_kwargs
+                )
             logger.info(f"✓ Model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             self.model = None
 
+    @property
+    def cache_scope(self) -> str:
+        """Namespace for cached embeddings: the model, plus the backend/export if not plain torch.
+        
+        Quantized exports drift slightly from the torch weights, so their vectors
+        are cached separately rather than mixed with the torch ones.
+        """
+        if self.backend == "torch":
+            return self.model_name
+        return f"{self.model_name}@{self.backend}:{self.model_file or ''}"
+
     def embed_text(self, text: str, use_cache: bool = True) -> List[float]:
         """Generate embedding for a single text string.
         
@@ -85,29 +174,69 @@ class EmbeddingService:
         if not self.model:
             logger.warning("Model not available, returning zero vector")
             # Return zero vector of typical embedding size (384 for all-MiniLM-L6-v2)
-            return [0.0] * 384
+            return [0.0] * EMBEDDING_DIM
+        
+        return self.embed_text_np(text, use_cache=use_cache).tolist()
+
+    def embed_text_np(self, text: str, use_cache: bool = True) -> np.ndarray:
+        """Generate embedding for a single text string as a float32 array.
+        
+        Same as embed_text, but keeps the vector as an ndarray for callers that
+        only feed it back into compute_similarity; convert with ``.tolist()``
+        at the API boundary.
         
-        # Try cache first
+        Args:
+            text: Input text to embed
+            use_cache: Whether to use cached embeddings if available
+            
+        Returns:
+            1-D float32 array holding the embedding vector
+        """
+        if not self.model:
+            logger.warning("Model not available, returning zero vector")
+            return np.zeros(EMBEDDING_DIM, dtype=np.float32)
+        
+        # Try the in-process cache, then Redis
         if use_cache:
-            cache_key = cache_service.get_text_embedding_key(text)
-            cached = cache_service.get(cache_key)
+            memory_key = (self.cache_scope, text)
+            with self._memory_cache_lock:
+                cached = self._memory_cache.get(memory_key)
+                if cached is not None:
+                    self._memory_cache.move_to_end(memory_key)
+                    return cached
+            
+            cache_key = cache_service.get_text_embedding_key(text, self.cache_scope)
+            cached = cache_service.get_embedding(cache_key)
             if cached is not None:
                 logger.debug(f"Cache hit for text embedding: {text[:50]}...")
-                return cached  # type: ignore
+                self._remember(memory_key, cached)
+                return cached
         
         try:
             embedding = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
-            embedding_list = embedding.tolist()
+            embedding = np.asarray(embedding, dtype=np.float32)
             
             # Cache the embedding
             if use_cache:
-                cache_key = cache_service.get_text_embedding_key(text)
-                cache_service.set(cache_key, embedding_list, CACHE_TTL_LONG)
+                cache_key = cache_service.get_text_embedding_key(text, self.cache_scope)
+                # Keyed by model and text, so the vector never goes stale
+                cache_service.set_embedding(cache_key, embedding, CACHE_TTL_VERY_LONG)
+                self._remember(memory_key, embedding)
             
-            return embedding_list
+            return embedding
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
-            return [0.0] * 384
+            return np.zeros(EMBEDDING_DIM, dtype=np.float32)
+
+    def _remember(self, memory_key: tuple[str, str], embedding: np.ndarray) -> None:
+        """Add an embedding to the in-process LRU, evicting the least recently used."""
+        # Callers share the cached array, so freeze it
+        embedding.setflags(write=False)
+        with self._memory_cache_lock:
+            self._memory_cache[memory_key] = embedding
+            self._memory_cache.move_to_end(memory_key)
+            if len(self._memory_cache) > TEXT_MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
 
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for a batch of texts (more efficient).
@@ -120,23 +249,48 @@ class EmbeddingService:
         """
         if not self.model:
             logger.warning("Model not available, returning zero vectors")
-            return [[0.0] * 384] * len(texts)
+            return [[0.0] * EMBEDDING_DIM] * len(texts)
         
         if not texts:
             return []
         
+        return self.embed_batch_np(texts).tolist()
+
+    def embed_batch_np(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for a batch of texts as a 2-D float32 array.
+        
+        Args:
+            texts: List of input texts to embed
+            
+        Returns:
+            Array of shape (len(texts), EMBEDDING_DIM), one row per text
+        """
+        if not self.model:
+            logger.warning("Model not available, returning zero vectors")
+            return np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        
+        if not texts:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        
+        # Encode each distinct text once; duplicates reuse its row
+        unique_texts = list(dict.fromkeys(texts))
+        
         try:
             embeddings = self.model.encode(
-                texts,
+                unique_texts,
                 batch_size=32,
                 convert_to_numpy=True,
                 normalize_embeddings=True,
                 show_progress_bar=False,
             )
-            return embeddings.tolist()
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            if len(unique_texts) == len(texts):
+                return embeddings
+            row_of = {text: row for row, text in enumerate(unique_texts)}
+            return embeddings[[row_of[text] for text in texts]]
         except Exception as e:
             logger.error(f"Error generating batch embeddings: {e}")
-            return [[0.0] * 384] * len(texts)
+            return np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
 
     def embed_profile_text(self, profile_data: dict, profile_id: str | None = None, use_cache: bool = True) -> List[float]:
         """Generate a single embedding for a profile by combining its text fields.
@@ -157,72 +311,58 @@ class EmbeddingService:
         Returns:
             Combined embedding vector for the profile
         """
+        if np is None:
+            # No numpy means no model either, so there is nothing to embed with
+            logger.warning("numpy not available, returning zero vector")
+            return [0.0] * EMBEDDING_DIM
+        
+        return self.embed_profile_np(profile_data, profile_id=profile_id, use_cache=use_cache).tolist()
+
+    def embed_profile_np(self, profile_data: dict, profile_id: str | None = None, use_cache: bool = True) -> np.ndarray:
+        """Generate a profile embedding (see embed_profile_text) as a float32 array.
+        
+        Args:
+            profile_data: Profile dict with fields like full_name, headline, prompts, etc.
+            profile_id: Optional profile ID for caching (if provided, caches by profile ID)
+            use_cache: Whether to use cached embeddings if available
+            
+        Returns:
+            1-D float32 array holding the combined embedding vector
+        """
         # Try profile-specific cache first
         if use_cache and profile_id:
             cache_key = cache_service.get_embedding_key(profile_id)
-            cached = cache_service.get(cache_key)
+            cached = cache_service.get_embedding(cache_key)
             if cached is not None:
                 logger.debug(f"Cache hit for profile embedding: {profile_id}")
-                return cached  # type: ignore
-        
-        text_parts = []
-        
-        # Basic info
-        if profile_data.get("full_name"):
-            text_parts.append(profile_data["full_name"])
-        if profile_data.get("headline"):
-            text_parts.append(profile_data["headline"])
-        if profile_data.get("location"):
-            text_parts.append(profile_data["location"])
-        
-        # Prompts (semantic content)
-        prompts = profile_data.get("prompts", [])
-        if isinstance(prompts, list):
-            for prompt in prompts:
-                if isinstance(prompt, dict) and prompt.get("content"):
-                    text_parts.append(prompt["content"])
-        
-        # Role-specific fields
-        if profile_data.get("role") == "investor":
-            if profile_data.get("firm"):
-                text_parts.append(profile_data["firm"])
-            if profile_data.get("focus_sectors"):
-                text_parts.extend(profile_data["focus_sectors"])
-            if profile_data.get("focus_stages"):
-                text_parts.extend(profile_data["focus_stages"])
-        elif profile_data.get("role") == "founder":
-            if profile_data.get("company_name"):
-                text_parts.append(profile_data["company_name"])
-            if profile_data.get("focus_markets"):
-                text_parts.extend(profile_data["focus_markets"])
+                return cached
         
-        # Combine all text parts
-        combined_text = " ".join(text_parts)
+        combined_text = profile_to_text(profile_data)
         
         if not combined_text.strip():
             logger.warning("Empty profile text, returning zero vector")
-            return [0.0] * 384
+            return np.zeros(EMBEDDING_DIM, dtype=np.float32)
         
-        embedding = self.embed_text(combined_text, use_cache=use_cache)
+        embedding = self.embed_text_np(combined_text, use_cache=use_cache)
         
         # Cache by profile ID if provided
         if use_cache and profile_id:
             cache_key = cache_service.get_embedding_key(profile_id)
-            cache_service.set(cache_key, embedding, CACHE_TTL_LONG)
+            cache_service.set_embedding(cache_key, embedding, CACHE_TTL_LONG)
         
         return embedding
 
-    def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
+    def compute_similarity(self, embedding1: List[float] | np.ndarray, embedding2: List[float] | np.ndarray) -> float:
         """Compute cosine similarity between two embeddings.
         
         Args:
-            embedding1: First embedding vector
-            embedding2: Second embedding vector
+            embedding1: First embedding vector (list or float32 array)
+            embedding2: Second embedding vector (list or float32 array)
             
         Returns:
             Similarity score between 0 and 1 (1 = identical, 0 = orthogonal)
         """
-        if not embedding1 or not embedding2:
+        if len(embedding1) == 0 or len(embedding2) == 0:
             return 0.0
         
         if len(embedding1) != len(embedding2):
@@ -231,9 +371,7 @@ class EmbeddingService:
         
         # Cosine similarity: dot product of normalized vectors
         try:
-            try:
-                import numpy as np
-            except ImportError:
+            if np is None:
                 logger.warning("numpy not available, using fallback similarity calculation")
                 # Fallback: simple dot product with manual normalization
                 dot_product = sum(a * b for a, b in zip(embedding1, embedding2))
@@ -246,17 +384,24 @@ class EmbeddingService:
                 similarity = dot_product / (norm1 * norm2)
                 return float(max(-1.0, min(1.0, similarity)))
             
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
+            vec1 = np.asarray(embedding1, dtype=np.float32)
+            vec2 = np.asarray(embedding2, dtype=np.float32)
             
-            # Normalize vectors
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-            
-            similarity = np.dot(vec1, vec2) / (norm1 * norm2)
+            if simsimd is not None:
+                # simsimd treats two zero vectors as identical; keep returning 0.0 for them
+                if not vec1.any() or not vec2.any():
+                    return 0.0
+                # simsimd.cosine returns the cosine distance (1 - similarity)
+                similarity = 1.0 - float(simsimd.cosine(vec1, vec2))
+            else:
+                # Three dot products over the same L1-resident vectors; cheaper
+                # than np.linalg.norm's per-call overhead for 384 dims
+                squared_norms = float(np.dot(vec1, vec1)) * float(np.dot(vec2, vec2))
+                
+                if squared_norms == 0:
+                    return 0.0
+                
+                similarity = float(np.dot(vec1, vec2)) / math.sqrt(squared_norms)
             # Clip to [-1, 1] range (though should be [0, 1] for normalized embeddings)
             return float(np.clip(similarity, -1.0, 1.0))
         except Exception as e:
@@ -277,6 +422,27 @@ def get_embedding_service() -> EmbeddingService:
     global _embedding_service
     if _embedding_service is None:
         model_name = getattr(settings, "embedding_model", "all-MiniLM-L6-v2")
-        _embedding_service = EmbeddingService(model_name=model_name)
+        _embedding_service = EmbeddingService(
+            model_name=model_name,
+            backend=getattr(settings, "embedding_backend", "torch"),
+            model_file=getattr(settings, "embedding_model_file", None),
+        )
     return _embedding_service
 
+
+def precompute_profile_embedding(profile_data: dict) -> None:
+    """Embed a freshly written profile and cache it under its id.
+    
+    Run as a background task after profile create/update, so ranking and
+    similarity requests find the embedding already cached instead of paying
+    for the forward pass themselves. A no-op when ML is off or unavailable.
+    """
+    if not settings.ml_enabled:
+        return
+    service = get_embedding_service()
+    if not service.is_available():
+        return
+    try:
+        service.embed_profile_np(profile_data, profile_id=profile_data.get("id"))
+    except Exception as e:
+        logger.error(f"Failed to precompute profile embedding: {e}")
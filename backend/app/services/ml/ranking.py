@@ -63,13 +63,12 @@ class RerankingService:
         
         scored_profiles = []
         
-        for candidate in candidate_profiles:
-            profile_id = candidate.get("id")
-            if not profile_id:
-                continue
-            
-            # 1. ML similarity score
-            similarity_score = self._get_similarity_score(current_profile, candidate)
+        # 1. ML similarity scores, computed for all candidates in one pass
+        candidates = [c for c in candidate_profiles if c.get("id")]
+        similarity_scores = self._get_similarity_scores(current_profile, candidates)
+        
+        for candidate, similarity_score in zip(candidates, similarity_scores):
+            profile_id = candidate["id"]
             
             # 2. Diligence score (default to 0.5 if not provided)
             diligence_score = 0.5
@@ -99,15 +98,15 @@ class RerankingService:
             return scored_profiles[:limit]
         return scored_profiles
 
-    def _get_similarity_score(self, current_profile: dict, candidate_profile: dict) -> float:
-        """Get ML-based similarity score."""
+    def _get_similarity_scores(self, current_profile: dict, candidate_profiles: List[dict]) -> List[float]:
+        """Get ML-based similarity scores, one per candidate."""
         try:
-            return self.recommendation_engine.compute_profile_similarity(
-                current_profile, candidate_profile
+            return self.recommendation_engine.compute_profile_similarities(
+                current_profile, candidate_profiles
             )
         except Exception as e:
-            logger.error(f"Error computing similarity score: {e}")
-            return 0.0
+            logger.error(f"Error computing similarity scores: {e}")
+            return [0.0] * len(candidate_profiles)
 
     def _compute_engagement_score(
         self,
@@ -5,6 +5,11 @@ from __future__ import annotations
 import logging
 from typing import Dict, List, Optional, Tuple
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 try:
     import torch
     import torch.nn as nn
@@ -17,7 +22,7 @@ except ImportError:
     F = None
 
 from app.core.config import settings
-from app.services.ml.embeddings import get_embedding_service
+from app.services.ml.embeddings import get_embedding_service, profile_to_text
 
 logger = logging.getLogger(__name__)
 
@@ -62,12 +67,12 @@ class RecommendationEngine:
             profile_b_id = profile_b_data.get("id")
             
             # Generate embeddings for both profiles (with caching)
-            embedding_a = self.embedding_service.embed_profile_text(
+            embedding_a = self.embedding_service.embed_profile_np(
                 profile_a_data, 
                 profile_id=profile_a_id,
                 use_cache=True
             )
-            embedding_b = self.embedding_service.embed_profile_text(
+            embedding_b = self.embedding_service.embed_profile_np(
                 profile_b_data,
                 profile_id=profile_b_id,
                 use_cache=True
@@ -98,8 +103,8 @@ class RecommendationEngine:
             return 0.0
         
         try:
-            embedding_a = self.embedding_service.embed_text(prompt_a)
-            embedding_b = self.embedding_service.embed_text(prompt_b)
+            embedding_a = self.embedding_service.embed_text_np(prompt_a)
+            embedding_b = self.embedding_service.embed_text_np(prompt_b)
             return self.embedding_service.compute_similarity(embedding_a, embedding_b)
         except Exception as e:
             logger.error(f"Error computing prompt similarity: {e}")
@@ -130,78 +135,105 @@ class RecommendationEngine:
         if not candidate_profiles:
             return []
         
-        try:
-            # Get current profile ID for caching
-            current_profile_id = current_profile.get("id")
+        similarities = self.compute_profile_similarities(current_profile, candidate_profiles)
+        scored_candidates = list(zip(candidate_profiles, similarities))
+        
+        # Sort by similarity (descending)
+        scored_candidates.sort(key=lambda x: x[1], reverse=True)
+        
+        if limit:
+            return scored_candidates[:limit]
+        return scored_candidates
+
+    def compute_profile_similarities(
+        self,
+        current_profile: dict,
+        candidate_profiles: List[dict],
+    ) -> List[float]:
+        """Compute the similarity of each candidate to the current profile.
+        
+        The current profile is embedded once and uncached candidates in one
+        batch; all candidates are then scored with a single matrix-vector
+        product over L2-normalized rows instead of one cosine call each.
+        
+        Args:
+            current_profile: The current user's profile data
+            candidate_profiles: List of candidate profile data dicts
             
+        Returns:
+            Similarity scores between 0 and 1, in candidate order
+        """
+        if not settings.ml_enabled or not self.embedding_service.is_available():
+            return [0.0] * len(candidate_profiles)
+        
+        if not candidate_profiles:
+            return []
+        
+        try:
             # Generate embedding for current profile once (with caching)
-            current_embedding = self.embedding_service.embed_profile_text(
+            current_embedding = self.embedding_service.embed_profile_np(
                 current_profile,
-                profile_id=current_profile_id,
+                profile_id=current_profile.get("id"),
                 use_cache=True
             )
+            candidate_matrix = self._candidate_embeddings(candidate_profiles)
+            return self._cosine_scores(current_embedding, candidate_matrix).tolist()
+        except Exception as e:
+            logger.error(f"Error computing profile similarities: {e}")
+            return [0.0] * len(candidate_profiles)
+
+    def _candidate_embeddings(self, candidate_profiles: List[dict]) -> "np.ndarray":
+        """Stack candidate embeddings into an (N, dim) float32 matrix, in candidate order.
+        
+        Cached embeddings are reused; the rest are generated in one batch and cached.
+        """
+        from app.core.cache import cache_service, CACHE_TTL_LONG
+        
+        embeddings: List[Optional[np.ndarray]] = [None] * len(candidate_profiles)
+        uncached_indices = []
+        
+        for idx, candidate in enumerate(candidate_profiles):
+            candidate_id = candidate.get("id")
+            if candidate_id:
+                cached = cache_service.get_embedding(cache_service.get_embedding_key(candidate_id))
+                if cached is not None:
+                    embeddings[idx] = cached
+                    continue
+            uncached_indices.append(idx)
+        
+        # Generate embeddings for uncached candidates (batch for efficiency)
+        if uncached_indices:
+            candidate_texts = [
+                profile_to_text(candidate_profiles[idx]) for idx in uncached_indices
+            ]
+            batch = self.embedding_service.embed_batch_np(candidate_texts)
             
-            # For candidates, check cache first, then batch process uncached ones
-            cached_embeddings = {}
-            uncached_profiles = []
-            uncached_indices = []
-            
-            for idx, candidate in enumerate(candidate_profiles):
-                candidate_id = candidate.get("id")
+            # Cache the new embeddings
+            for idx, embedding in zip(uncached_indices, batch):
+                candidate_id = candidate_profiles[idx].get("id")
                 if candidate_id:
-                    from app.core.cache import cache_service
                     cache_key = cache_service.get_embedding_key(candidate_id)
-                    cached = cache_service.get(cache_key)
-                    if cached is not None:
-                        cached_embeddings[idx] = cached
-                        continue
-                
-                uncached_profiles.append(candidate)
-                uncached_indices.append(idx)
-            
-            # Generate embeddings for uncached candidates (batch for efficiency)
-            if uncached_profiles:
-                candidate_texts = [
-                    self._profile_to_text(p) for p in uncached_profiles
-                ]
-                candidate_embeddings_batch = self.embedding_service.embed_batch(candidate_texts)
-                
-                # Cache the new embeddings
-                for idx, candidate, embedding in zip(
-                    uncached_indices, uncached_profiles, candidate_embeddings_batch
-                ):
-                    candidate_id = candidate.get("id")
-                    if candidate_id:
-                        from app.core.cache import cache_service, CACHE_TTL_LONG
-                        cache_key = cache_service.get_embedding_key(candidate_id)
-                        cache_service.set(cache_key, embedding, CACHE_TTL_LONG)
-                    cached_embeddings[idx] = embedding
-            
-            # Compute similarities
-            scored_candidates = []
-            for idx, candidate_profile in enumerate(candidate_profiles):
-                candidate_embedding = cached_embeddings.get(idx)
-                if candidate_embedding is None:
-                    continue
-                
-                similarity = self.embedding_service.compute_similarity(
-                    current_embedding, candidate_embedding
-                )
-                scored_candidates.append((candidate_profile, similarity))
-            
-            # Sort by similarity (descending)
-            scored_candidates.sort(key=lambda x: x[1], reverse=True)
-            
-            if limit:
-                return scored_candidates[:limit]
-            return scored_candidates
-            
-        except Exception as e:
-            logger.error(f"Error ranking candidates: {e}")
-            # Fallback: return original order
-            if limit:
-                return [(p, 0.0) for p in candidate_profiles[:limit]]
-            return [(p, 0.0) for p in candidate_profiles]
+                    cache_service.set_embedding(cache_key, embedding, CACHE_TTL_LONG)
+                embeddings[idx] = embedding
+        
+        return np.stack(embeddings).astype(np.float32, copy=False)
+
+    @staticmethod
+    def _cosine_scores(query: "np.ndarray", matrix: "np.ndarray") -> "np.ndarray":
+        """Cosine similarity of every row of ``matrix`` to ``query``, clipped to [-1, 1].
+        
+        Zero vectors (empty profiles, unavailable model) score 0.0, matching
+        EmbeddingService.compute_similarity.
+        """
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return np.zeros(len(matrix), dtype=np.float32)
+        
+        row_norms = np.linalg.norm(matrix, axis=1)
+        # Rows with zero norm have a zero dot product, so any non-zero divisor yields 0.0
+        row_norms[row_norms == 0] = 1.0
+        scores = (matrix @ query) / (row_norms * query_norm)
+        return np.clip(scores, -1.0, 1.0)
 
     def find_similar_profiles(
         self,
@@ -225,41 +257,6 @@ class RecommendationEngine:
         filtered = [(p, score) for p, score in ranked if score >= similarity_threshold]
         return filtered[:top_k]
 
-    @staticmethod
-    def _profile_to_text(profile: dict) -> str:
-        """Convert profile dict to text for embedding."""
-        text_parts = []
-        
-        if profile.get("full_name"):
-            text_parts.append(profile["full_name"])
-        if profile.get("headline"):
-            text_parts.append(profile["headline"])
-        if profile.get("location"):
-            text_parts.append(profile["location"])
-        
-        # Prompts
-        prompts = profile.get("prompts", [])
-        if isinstance(prompts, list):
-            for prompt in prompts:
-                if isinstance(prompt, dict) and prompt.get("content"):
-                    text_parts.append(prompt["content"])
-        
-        # Role-specific
-        if profile.get("role") == "investor":
-            if profile.get("firm"):
-                text_parts.append(profile["firm"])
-            if profile.get("focus_sectors"):
-                text_parts.extend(profile["focus_sectors"])
-            if profile.get("focus_stages"):
-                text_parts.extend(profile["focus_stages"])
-        elif profile.get("role") == "founder":
-            if profile.get("company_name"):
-                text_parts.append(profile["company_name"])
-            if profile.get("focus_markets"):
-                text_parts.extend(profile["focus_markets"])
-        
-        return " ".join(text_parts)
-
 
 # Global instance
 _recommendation_engine: Optional[RecommendationEngine] = None
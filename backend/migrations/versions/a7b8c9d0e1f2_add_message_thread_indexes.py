@@ -0,0 +1,36 @@
+"""Add composite indexes for message thread queries
+
+Revision ID: a7b8c9d0e1f2
+Revises: c1d2e3f4a5b6
+Create Date: 2026-03-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, None] = "c1d2e3f4a5b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_messages_match_id_created_at",
+        "messages",
+        ["match_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_messages_match_id_sender_id_read_at",
+        "messages",
+        ["match_id", "sender_id", "read_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_match_id_sender_id_read_at", table_name="messages")
+    op.drop_index("ix_messages_match_id_created_at", table_name="messages")
@@ -0,0 +1,29 @@
+"""Add composite index for prompt template listing
+
+Revision ID: b2c3d4e5f6a7
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "b2c3d4e5f6a7"
+down_revision: Union[str, None] = "a7b8c9d0e1f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_prompt_templates_role_is_active_display_order",
+        "prompt_templates",
+        ["role", "is_active", "display_order"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prompt_templates_role_is_active_display_order", table_name="prompt_templates")
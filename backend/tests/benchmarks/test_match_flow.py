@@ -0,0 +1,67 @@
+"""Regression benchmarks for the like -> match flow.
+
+Skipped in normal runs; run them serially with:
+
+    pytest tests/benchmarks --benchmark-only -n 0
+"""
+
+from __future__ import annotations
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, or_
+
+from app.core.dependencies import get_current_user_profile
+from app.main import app
+from app.models.match import DailyLimit, Like, Match
+from app.models.profile import Profile
+
+LIKES_URL = "/api/v1/matches/likes"
+
+pytestmark = pytest.mark.benchmark(group="matches")
+
+
+@pytest.fixture
+def reset_pair(db_session, investor: Profile, founder: Profile):
+    """Return a setup hook that clears likes, matches and daily limits for the pair."""
+    pair = (investor.id, founder.id)
+
+    def _reset() -> None:
+        db_session.execute(delete(Like).where(or_(Like.sender_id.in_(pair), Like.recipient_id.in_(pair))))
+        db_session.execute(delete(Match).where(Match.founder_id == founder.id, Match.investor_id == investor.id))
+        db_session.execute(delete(DailyLimit).where(DailyLimit.profile_id.in_(pair)))
+        db_session.commit()
+
+    return _reset
+
+
+def _send_like(client: TestClient, sender: Profile, recipient: Profile) -> dict:
+    # The flow under test starts after authentication, so act as the sender directly
+    app.dependency_overrides[get_current_user_profile] = lambda: sender
+    response = client.post(LIKES_URL, json={"sender_id": sender.id, "recipient_id": recipient.id})
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_first_like(benchmark, client: TestClient, investor: Profile, founder: Profile, reset_pair):
+    """One-way like: stored as pending, no match."""
+    data = benchmark.pedantic(
+        _send_like, args=(client, investor, founder), setup=reset_pair, rounds=20
+    )
+
+    assert data["status"] == "pending"
+
+
+def test_mutual_like_creates_match(benchmark, client: TestClient, investor: Profile, founder: Profile, reset_pair):
+    """Like back after a pending like: creates the match."""
+
+    def setup() -> None:
+        reset_pair()
+        _send_like(client, founder, investor)
+
+    data = benchmark.pedantic(
+        _send_like, args=(client, investor, founder), setup=setup, rounds=20
+    )
+
+    assert data["status"] == "matched"
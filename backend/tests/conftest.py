@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
 import uuid
-from typing import Generator
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Callable, Generator, Iterator
+from unittest.mock import MagicMock
 
 # Set test environment variables BEFORE any imports
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
@@ -13,18 +17,35 @@ os.environ["REDIS_URL"] = "redis://localhost:6379/15"
 os.environ["RATE_LIMIT_ENABLED"] = "false"
 os.environ["ML_ENABLED"] = "false"  # Disable ML in tests to avoid dependency conflicts
 
+import httpx
 import pytest
-from fakeredis import FakeStrictRedis
+from fakeredis import FakeServer, FakeStrictRedis
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, SQLModel, create_engine
 
 from app.core.config import get_settings, settings
+from app.core.dependencies import get_current_user_profile
 from app.core.redis import redis_client as original_redis_client
 from app.db.session import get_session
 from app.main import app
+from app.models.match import Match
+from app.models.profile import Profile
 
 # Import after app.main to avoid circular imports
+from app.core import cache as cache_module
 from app.core import redis as redis_module
+from app.db import session as db_session_module
+from app.services import realtime_broadcast
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Clear settings cache to force reload with test env vars
 get_settings.cache_clear()
@@ -50,9 +71,50 @@ def test_settings():
     get_settings.cache_clear()
 
 
-@pytest.fixture(scope="function")
-def db_session() -> Generator[Session, None, None]:
-    """Create a test database session with in-memory SQLite."""
+def _disable_sqlite_durability(dbapi_connection) -> None:
+    """Nothing in the test run needs durability, so skip journaling and fsync work."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _use_orjson(response: httpx.Response) -> None:
+    """Parse this response's body with orjson when it is installed.
+    
+    Only UTF-8 bodies read without json.loads keyword arguments take the fast
+    path. Anything orjson rejects (NaN/Infinity, integers wider than 64 bits)
+    falls back to httpx's own parser, so results match the stdlib.
+    """
+    if not ORJSON_AVAILABLE:
+        return
+    
+    stdlib_json = response.json
+    
+    def _json(**kwargs: Any) -> Any:
+        if kwargs or (response.charset_encoding or "utf-8").lower() not in ("utf-8", "utf8"):
+            return stdlib_json(**kwargs)
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            return stdlib_json()
+    
+    response.json = _json
+
+
+async def _use_orjson_async(response: httpx.Response) -> None:
+    """Async event hook form of :func:`_use_orjson` for the shared AsyncClient."""
+    _use_orjson(response)
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Create the in-memory SQLite engine and schema once per test session.
+    
+    Under pytest-xdist every worker is its own process, so each worker gets
+    a private in-memory database and nothing is shared between them.
+    """
     # Import models to ensure metadata is populated
     from app.models import (  # noqa: F401
         Like,
@@ -64,77 +126,313 @@ def db_session() -> Generator[Session, None, None]:
         User,
     )
     
-    # Create in-memory SQLite engine
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    # StaticPool keeps a single in-memory database shared by every checkout
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # pysqlite defers BEGIN and mishandles SAVEPOINT; take over transaction
+        # control so nested transactions behave as SQLAlchemy expects.
+        dbapi_connection.isolation_level = None
+        _disable_sqlite_durability(dbapi_connection)
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
     
-    # Create all tables BEFORE creating session
     SQLModel.metadata.create_all(engine)
     
-    # Create session - use engine.connect() to ensure connection is active
-    connection = engine.connect()
+    yield engine
+    
+    SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_engine() -> Generator[Engine, None, None]:
+    """Back the application's own engine with one shared in-memory database.
+    
+    Every TestClient lifespan runs create_db_and_tables(). With the default
+    pool each lifespan thread opened a brand-new ``:memory:`` database and
+    replayed the full DDL; with StaticPool the schema is created once here and
+    later create_all() calls find the tables already in place.
+    """
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(engine, "connect", lambda dbapi_connection, _: _disable_sqlite_durability(dbapi_connection))
+    SQLModel.metadata.create_all(engine)
+    original_engine = db_session_module.engine
+    db_session_module.engine = engine
+    
+    yield engine
+    
+    db_session_module.engine = original_engine
+    engine.dispose()
+
+
+_SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@contextmanager
+def _record_queries(engine) -> Iterator[list[str]]:
+    """Collect every SQL statement the engine executes inside the block."""
+    statements: list[str] = []
+    
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # SAVEPOINT bookkeeping comes from the test's transaction wrapping;
+        # in production the same commits go through the DBAPI, not a cursor
+        if not statement.startswith(_SAVEPOINT_STATEMENTS):
+            statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@pytest.fixture
+def count_queries(db_engine):
+    """Context manager recording the statements issued by the code under test.
+    
+    Usage::
+    
+        with count_queries() as queries:
+            client.get(...)
+        assert len(queries) <= 5
+    """
+    return lambda: _record_queries(db_engine)
+
+
+@pytest.fixture(scope="session")
+def db_connection(db_engine) -> Generator[Connection, None, None]:
+    """Hold one connection with an outer transaction for the whole session."""
+    connection = db_engine.connect()
     transaction = connection.begin()
-    session = Session(bind=connection)
+    
+    yield connection
+    
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="module")
+def seeded_profiles(db_connection: Connection) -> Generator[tuple[str, str], None, None]:
+    """Insert the shared investor/founder pair once per module.
+    
+    The rows live in a SAVEPOINT that is rolled back when the module
+    finishes, so modules that never request them see an empty table.
+    """
+    savepoint = db_connection.begin_nested()
+    session = Session(bind=db_connection, join_transaction_mode="create_savepoint")
+    investor = build_profile(_investor_profile_data())
+    founder = build_profile(_founder_profile_data())
+    session.add_all([investor, founder])
+    session.commit()
+    ids = (investor.id, founder.id)
+    session.close()
+    
+    yield ids
+    
+    savepoint.rollback()
+
+
+@pytest.fixture(scope="module")
+def seeded_match(db_connection: Connection, seeded_profiles: tuple[str, str]) -> Generator[str, None, None]:
+    """Insert an active match between the shared pair once per module.
+    
+    Opt-in: only modules whose tests request ``match`` get the row, in its
+    own SAVEPOINT layered on top of the seeded profiles.
+    """
+    investor_id, founder_id = seeded_profiles
+    savepoint = db_connection.begin_nested()
+    session = Session(bind=db_connection, join_transaction_mode="create_savepoint")
+    match = Match(founder_id=founder_id, investor_id=investor_id, status="active")
+    session.add(match)
+    session.commit()
+    match_id = match.id
+    session.close()
+    
+    yield match_id
+    
+    savepoint.rollback()
+
+
+@pytest.fixture(scope="function")
+def db_session(db_connection: Connection) -> Generator[Session, None, None]:
+    """Create a test database session wrapped in a SAVEPOINT.
+    
+    Commits made by the test (or by endpoints through the overridden
+    dependency) only release inner savepoints; everything is rolled back
+    when the test finishes.
+    """
+    savepoint = db_connection.begin_nested()
+    session = Session(bind=db_connection, join_transaction_mode="create_savepoint")
     
     try:
         yield session
-        session.rollback()
     finally:
         session.close()
-        transaction.rollback()
-        connection.close()
-        # Drop all tables after test
-        SQLModel.metadata.drop_all(engine)
+        savepoint.rollback()
+
+
+@pytest.fixture
+def investor(db_session: Session, seeded_profiles: tuple[str, str]) -> Profile:
+    """Shared investor profile, attached to the current test session."""
+    return db_session.get(Profile, seeded_profiles[0])
+
+
+@pytest.fixture
+def founder(db_session: Session, seeded_profiles: tuple[str, str]) -> Profile:
+    """Shared founder profile, attached to the current test session."""
+    return db_session.get(Profile, seeded_profiles[1])
+
+
+@pytest.fixture
+def match(db_session: Session, seeded_match: str) -> Match:
+    """Shared match between ``investor`` and ``founder``, attached to the current test session."""
+    return db_session.get(Match, seeded_match)
 
 
 @pytest.fixture(scope="function")
 def redis_client() -> Generator[FakeStrictRedis, None, None]:
     """Create a fake Redis client for testing."""
-    fake_redis = FakeStrictRedis(decode_responses=True)
+    server = FakeServer()
+    fake_redis = FakeStrictRedis(server=server, decode_responses=True)
+    # Bytes-mode client on the same fake server, for the binary embedding cache
+    fake_binary_redis = FakeStrictRedis(server=server)
     
     # Replace the redis_client in the redis module temporarily
     original_client = redis_module.redis_client
+    original_binary_client = redis_module.binary_redis_client
+    original_cache_binary_client = cache_module.binary_redis_client
     redis_module.redis_client = fake_redis
+    redis_module.binary_redis_client = fake_binary_redis
+    cache_module.binary_redis_client = fake_binary_redis
     
     yield fake_redis
     
     # Restore original client
     redis_module.redis_client = original_client
+    redis_module.binary_redis_client = original_binary_client
+    cache_module.binary_redis_client = original_cache_binary_client
     fake_redis.flushall()
 
 
+@pytest.fixture(scope="session")
+def _session_test_client() -> Generator[TestClient, None, None]:
+    """Run the app lifespan once and share the TestClient across the session."""
+    with TestClient(app) as test_client:
+        test_client.event_hooks["response"].append(_use_orjson)
+        yield test_client
+
+    # The broadcast queue/worker are bound to the TestClient's event loop,
+    # which is gone now; drop them so a later lifespan starts fresh.
+    realtime_broadcast._broadcast_queue = None
+    realtime_broadcast._broadcast_task = None
+
+
 @pytest.fixture(scope="function")
-def client(db_session: Session, redis_client: FakeStrictRedis) -> Generator[TestClient, None, None]:
-    """Create a FastAPI test client with overridden dependencies."""
+def app_overrides(db_session: Session, redis_client: FakeStrictRedis) -> Generator[None, None, None]:
+    """Point the app at this test's database session and switch off rate limiting.
+    
+    The app, its routes and the client lifespans are shared for the whole
+    session; only this wiring is per test, because each test has its own
+    ``db_session``.
+    """
     
     def override_get_session():
         """Override database session dependency."""
-        try:
-            yield db_session
-        finally:
-            pass
+        yield db_session
     
     # Override database dependency - this ensures all endpoints use our test session
-    from app.db import session as db_session_module
-    
-    # Override the dependency
     app.dependency_overrides[get_session] = override_get_session
     
     # Disable rate limiting for tests
     if hasattr(app.state, "limiter"):
         app.state.limiter.enabled = False
     
-    with TestClient(app) as test_client:
-        yield test_client
+    yield
     
-    # Cleanup
     app.dependency_overrides.clear()
     if hasattr(app.state, "limiter"):
         app.state.limiter.enabled = True
 
 
-@pytest.fixture
-def sample_investor_profile_data():
-    """Sample investor profile data for testing."""
+@pytest.fixture(scope="function")
+def act_as(app_overrides: None) -> Callable[[Profile], None]:
+    """Authenticate requests as a given profile, skipping the token round trip.
+    
+    Overrides ``get_current_user_profile``; call it again to switch sides
+    mid-test. Cleared with the other overrides when the test ends.
+    """
+    
+    def _act_as(profile: Profile) -> None:
+        app.dependency_overrides[get_current_user_profile] = lambda: profile
+    
+    return _act_as
+
+
+@pytest.fixture(scope="function")
+def client(_session_test_client: TestClient, app_overrides: None) -> Generator[TestClient, None, None]:
+    """Create a FastAPI test client with overridden dependencies."""
+    yield _session_test_client
+    
+    _session_test_client.cookies.clear()
+
+
+@pytest.fixture(scope="session")
+def asgi_client() -> Generator[AsyncClient, None, None]:
+    """Share one in-process AsyncClient across the whole test session.
+    
+    Requests go straight to the ASGI app without TestClient's thread
+    portal or a lifespan run per test.
+    """
+    http_client = AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+        event_hooks={"response": [_use_orjson_async]},
+    )
+    
+    yield http_client
+    
+    asyncio.run(http_client.aclose())
+
+
+@pytest.fixture(scope="function")
+def async_client(asgi_client: AsyncClient, app_overrides: None) -> AsyncClient:
+    """Wire the shared AsyncClient to this test's database session."""
+    return asgi_client
+
+
+# Fixed ids for the extra profiles a test creates on top of the seeded pair.
+# Each test rolls back to its SAVEPOINT, so every test can reuse the same ids,
+# and failures name the same rows from run to run.
+PROFILE_IDS = tuple(str(uuid.UUID(int=i)) for i in range(1, 17))
+
+
+# Read-only prompt payloads for the sample profiles. Builders hand out plain
+# dict copies, so a test mutating its profile can never leak into another.
+# That one copy per build is the only one left: build_profile passes prompts
+# and verification through untouched, and the JSON column cannot serialize a
+# mappingproxy, so handing out the frozen entries directly is not an option.
+INVESTOR_PROMPTS = (
+    MappingProxyType({"prompt_id": "inv_mission", "content": "I love startups solving hard problems."}),
+)
+FOUNDER_PROMPTS = (
+    MappingProxyType({"prompt_id": "found_mission", "content": "We're building the future of work."}),
+)
+
+
+def _investor_profile_data() -> dict[str, Any]:
+    """Build sample investor profile data with a fresh id."""
     return {
         "id": str(uuid.uuid4()),
         "role": "investor",
@@ -147,9 +445,7 @@ def sample_investor_profile_data():
         "check_size_max": 1000000,
         "focus_sectors": ["AI", "SaaS"],
         "focus_stages": ["Seed", "Series A"],
-        "prompts": [
-            {"prompt_id": "inv_mission", "content": "I love startups solving hard problems."}
-        ],
+        "prompts": [dict(p) for p in INVESTOR_PROMPTS],
         "verification": {
             "soft_verified": True,
             "manual_reviewed": False,
@@ -159,9 +455,8 @@ def sample_investor_profile_data():
     }
 
 
-@pytest.fixture
-def sample_founder_profile_data():
-    """Sample founder profile data for testing."""
+def _founder_profile_data() -> dict[str, Any]:
+    """Build sample founder profile data with a fresh id."""
     return {
         "id": str(uuid.uuid4()),
         "role": "founder",
@@ -175,9 +470,7 @@ def sample_founder_profile_data():
         "team_size": 10,
         "runway_months": 18,
         "focus_markets": ["US"],
-        "prompts": [
-            {"prompt_id": "found_mission", "content": "We're building the future of work."}
-        ],
+        "prompts": [dict(p) for p in FOUNDER_PROMPTS],
         "verification": {
             "soft_verified": True,
             "manual_reviewed": False,
@@ -187,6 +480,40 @@ def sample_founder_profile_data():
     }
 
 
+def build_profile(sample: dict[str, Any], **overrides: Any) -> Profile:
+    """Materialize a Profile from one of the sample profile data dicts.
+    
+    ``overrides`` replace individual fields, e.g. a fresh ``id``/``email``
+    for a second profile of the same role. The sample dicts are built fresh
+    for every call, so their prompt and verification payloads are handed to
+    the model as-is.
+    """
+    data = {**sample, **overrides}
+    prompts = data.pop("prompts", [])
+    verification = data.pop("verification", {})
+    return Profile(**data, prompts=prompts, verification=verification)
+
+
+def create_match(session: Session, founder: Profile, investor: Profile, status: str = "active") -> Match:
+    """Insert a Match row directly, for tests that don't exercise the like flow."""
+    match = Match(founder_id=founder.id, investor_id=investor.id, status=status)
+    session.add(match)
+    session.commit()
+    return match
+
+
+@pytest.fixture
+def sample_investor_profile_data():
+    """Sample investor profile data for testing."""
+    return _investor_profile_data()
+
+
+@pytest.fixture
+def sample_founder_profile_data():
+    """Sample founder profile data for testing."""
+    return _founder_profile_data()
+
+
 @pytest.fixture
 def sample_prompt_template_data():
     """Sample prompt template data for testing."""
@@ -199,3 +526,32 @@ def sample_prompt_template_data():
         "is_active": True,
     }
 
+
+
+@pytest.fixture(scope="session")
+def mock_encoding_384():
+    """A single all-MiniLM-L6-v2 sized embedding, built once per session.
+    
+    Read-only so a test can't change what the next test's mock model returns.
+    """
+    np = pytest.importorskip("numpy")
+    encoding = np.full(384, 0.1, dtype=np.float32)
+    encoding.setflags(write=False)
+    return encoding
+
+
+@pytest.fixture(scope="session")
+def mock_encoding_batch_384():
+    """A two-row batch of 384-dim embeddings, built once per session."""
+    np = pytest.importorskip("numpy")
+    batch = np.stack([np.full(384, 0.1, dtype=np.float32), np.full(384, 0.2, dtype=np.float32)])
+    batch.setflags(write=False)
+    return batch
+
+
+@pytest.fixture
+def mock_encoder(mock_encoding_384) -> MagicMock:
+    """A stand-in sentence-transformers model whose encode() returns mock_encoding_384."""
+    model = MagicMock()
+    model.encode.return_value = mock_encoding_384
+    return model
@@ -6,27 +6,25 @@ import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from app.models.profile import Profile
 from app.models.startup_of_month import StartupOfMonth
+from tests.conftest import PROFILE_IDS, build_profile
 
 
-@pytest.mark.unit
-def test_get_pending_verifications(client: TestClient, db_session, sample_founder_profile_data):
-    """Test getting pending verifications."""
-    # Create unverified profile
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification_data = {
+def _unverified() -> dict:
+    """Verification payload for a profile still waiting on admin review."""
+    return {
         "soft_verified": False,
         "manual_reviewed": False,
         "accreditation_attested": False,
         "badges": [],
     }
-    founder_data["verification"] = verification_data
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-    )
+
+
+@pytest.mark.unit
+def test_get_pending_verifications(client: TestClient, db_session, sample_founder_profile_data):
+    """Test getting pending verifications."""
+    # Create unverified profile
+    founder = build_profile(sample_founder_profile_data, verification=_unverified())
     db_session.add(founder)
     db_session.commit()
     
@@ -46,19 +44,7 @@ def test_get_pending_verifications(client: TestClient, db_session, sample_founde
 def test_review_verification(client: TestClient, db_session, sample_founder_profile_data):
     """Test reviewing a verification."""
     # Create profile
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification_data = {
-        "soft_verified": False,
-        "manual_reviewed": False,
-        "accreditation_attested": False,
-        "badges": [],
-    }
-    founder_data["verification"] = verification_data
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-    )
+    founder = build_profile(sample_founder_profile_data, verification=_unverified())
     db_session.add(founder)
     db_session.commit()
     
@@ -82,13 +68,7 @@ def test_review_verification(client: TestClient, db_session, sample_founder_prof
 def test_feature_startup_of_month(client: TestClient, db_session, sample_founder_profile_data):
     """Test featuring a startup of the month."""
     # Create founder profile
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    founder_data["verification"] = {"soft_verified": False}
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-    )
+    founder = build_profile(sample_founder_profile_data, verification={"soft_verified": False})
     db_session.add(founder)
     db_session.commit()
     
@@ -116,25 +96,17 @@ def test_feature_startup_of_month(client: TestClient, db_session, sample_founder
 def test_get_current_startup_of_month(client: TestClient, db_session, sample_founder_profile_data):
     """Test getting current startup of the month."""
     # Create founder and feature
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    founder_data["verification"] = {"soft_verified": False}
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-    )
-    db_session.add(founder)
-    db_session.commit()
+    founder = build_profile(sample_founder_profile_data, verification={"soft_verified": False})
     
     # Create startup of month
-    from datetime import datetime
     startup = StartupOfMonth(
         profile_id=founder.id,
         year=2025,
         month=1,
         reason="Great startup",
     )
-    db_session.add(startup)
+    # Profile ids are assigned client-side, so both rows go in one flush
+    db_session.add_all([founder, startup])
     db_session.commit()
     
     # Get current
@@ -162,19 +134,7 @@ def test_get_admin_stats(client: TestClient, db_session):
 @pytest.mark.unit
 def test_review_verification_reject(client: TestClient, db_session, sample_founder_profile_data):
     """Test rejecting a verification."""
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification_data = {
-        "soft_verified": False,
-        "manual_reviewed": False,
-        "accreditation_attested": False,
-        "badges": [],
-    }
-    founder_data["verification"] = verification_data
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-    )
+    founder = build_profile(sample_founder_profile_data, verification=_unverified())
     db_session.add(founder)
     db_session.commit()
     
@@ -198,26 +158,10 @@ def test_review_verification_reject(client: TestClient, db_session, sample_found
 def test_get_admin_stats_with_data(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
     """Test admin stats with actual profile data."""
     # Create profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+    investor = build_profile(sample_investor_profile_data)
+    founder = build_profile(sample_founder_profile_data)
     
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
+    db_session.add_all([investor, founder])
     db_session.commit()
     
     response = client.get("/api/v1/admin/stats")
@@ -233,15 +177,7 @@ def test_get_admin_stats_with_data(client: TestClient, db_session, sample_invest
 @pytest.mark.unit
 def test_feature_startup_of_month_different_months(client: TestClient, db_session, sample_founder_profile_data):
     """Test featuring same startup for different months."""
-    import uuid
-    founder_data = sample_founder_profile_data.copy()
-    founder_data["id"] = str(uuid.uuid4())  # Generate new ID
-    prompts = founder_data.pop("prompts", [])
-    founder_data["verification"] = {"soft_verified": False}
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-    )
+    founder = build_profile(sample_founder_profile_data, id=PROFILE_IDS[0], verification={"soft_verified": False})
     db_session.add(founder)
     db_session.commit()
     
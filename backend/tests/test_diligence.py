@@ -6,21 +6,14 @@ import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from app.models.profile import Profile
+from tests.conftest import build_profile
 
 
 @pytest.mark.unit
 def test_get_diligence_summary(client: TestClient, db_session, sample_founder_profile_data):
     """Test getting due diligence summary for a profile."""
     # Create founder profile
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+    founder = build_profile(sample_founder_profile_data)
     db_session.add(founder)
     db_session.commit()
     
@@ -48,14 +41,7 @@ def test_get_diligence_summary_not_found(client: TestClient):
 def test_get_diligence_summary_force_refresh(client: TestClient, db_session, sample_founder_profile_data):
     """Test getting diligence summary with force refresh."""
     # Create founder profile
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+    founder = build_profile(sample_founder_profile_data)
     db_session.add(founder)
     db_session.commit()
     
@@ -71,14 +57,7 @@ def test_get_diligence_summary_force_refresh(client: TestClient, db_session, sam
 @pytest.mark.unit
 def test_get_diligence_summary_cached(client: TestClient, db_session, sample_founder_profile_data):
     """Test that diligence summary can be cached."""
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+    founder = build_profile(sample_founder_profile_data)
     db_session.add(founder)
     db_session.commit()
     
@@ -95,14 +74,7 @@ def test_get_diligence_summary_cached(client: TestClient, db_session, sample_fou
 @pytest.mark.unit
 def test_get_diligence_summary_investor(client: TestClient, db_session, sample_investor_profile_data):
     """Test getting diligence for investor profile (may have different scoring)."""
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+    investor = build_profile(sample_investor_profile_data)
     db_session.add(investor)
     db_session.commit()
     
@@ -4,287 +4,174 @@ from __future__ import annotations
 
 import pytest
 from fastapi import status
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
+from sqlalchemy import bindparam, select
 
-from app.models.match import Like, Match
+from app.models.match import Match
 from app.models.profile import Profile
+from app.services.matching import matching_service
+from tests.conftest import PROFILE_IDS, build_profile, create_match
 
+MATCHES_URL = "/api/v1/matches"
+LIKES_URL = "/api/v1/matches/likes"
 
-@pytest.mark.unit
-def test_send_like_success(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test sending a like successfully."""
-    # Create two profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
-    db_session.commit()
-    
-    # Send like
-    response = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": investor.id,
-            "recipient_id": founder.id,
-            "note": "I'm interested in your startup!",
-        },
-    )
-    
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert data["status"] == "pending"  # Should be pending (one-way like)
-    assert data["match"] is None
-    
-    # Verify like was created
-    from sqlalchemy import select
-    like_result = db_session.exec(
-        select(Like).where(
-            Like.sender_id == investor.id,
-            Like.recipient_id == founder.id,
-        )
-    ).first()
-    assert like_result is not None
-    # Note may be None or a string
-    if hasattr(like_result, 'note'):
-        assert like_result.note == "I'm interested in your startup!" or like_result.note is None
+# Built once; tests only bind parameters
+_MATCH_ID_STMT = select(Match.id).where(
+    Match.founder_id == bindparam("founder_id"),
+    Match.investor_id == bindparam("investor_id"),
+)
 
 
 @pytest.mark.unit
-def test_send_like_creates_match(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test that mutual likes create a match."""
-    # Create two profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
-    db_session.commit()
-    
-    # Founder likes investor first
-    response1 = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": founder.id,
-            "recipient_id": investor.id,
-        },
-    )
-    assert response1.status_code == status.HTTP_200_OK
-    assert response1.json()["status"] == "pending"
-    
-    # Investor likes founder back (should create match)
-    response2 = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": investor.id,
-            "recipient_id": founder.id,
-        },
-    )
-    
-    assert response2.status_code == status.HTTP_200_OK
-    data = response2.json()
-    assert data["status"] == "matched"
-    assert data["match"] is not None
-    assert "id" in data["match"]
-    
-    # Verify match was created
-    from sqlalchemy import select
-    match = db_session.exec(
-        select(Match).where(
-            (Match.founder_id == founder.id) & (Match.investor_id == investor.id)
+class TestMutualLikes:
+    """Like/match flows between the shared investor/founder pair."""
+
+    @pytest.fixture(autouse=True)
+    def _pair(self, async_client: AsyncClient, db_session, investor: Profile, founder: Profile, act_as):
+        """Bind the shared pair and client; each test still runs in its own SAVEPOINT."""
+        self.client = async_client
+        self.db_session = db_session
+        self.investor = investor
+        self.founder = founder
+        self.act_as = act_as
+
+    @pytest.mark.asyncio
+    async def test_send_like_success(self):
+        """Test sending a like successfully."""
+        self.act_as(self.investor)
+        
+        # Send like
+        response = await self.client.post(
+            LIKES_URL,
+            json={
+                "sender_id": self.investor.id,
+                "recipient_id": self.founder.id,
+                "note": "I'm interested in your startup!",
+            },
         )
-    ).first()
-    assert match is not None
-
 
-@pytest.mark.unit
-def test_list_matches(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test listing matches for a user."""
-    # Create profiles and match
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
-    db_session.commit()
-    
-    # Create match by sending mutual likes via API
-    # Founder likes investor first
-    response1 = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": founder.id,
-            "recipient_id": investor.id,
-        },
-    )
-    assert response1.status_code == status.HTTP_200_OK
-    
-    # Investor likes founder back (creates match)
-    response2 = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": investor.id,
-            "recipient_id": founder.id,
-        },
-    )
-    assert response2.status_code == status.HTTP_200_OK
-    match_response = response2.json()
-    assert match_response["status"] == "matched"
-    match_id = match_response["match"]["id"]
-    
-    # List matches for investor
-    response = client.get(f"/api/v1/matches?profile_id={investor.id}")
-    
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert isinstance(data, list)
-    assert len(data) >= 1
-    # Find the match we just created
-    match_data = next((m for m in data if m["id"] == match_id), None)
-    assert match_data is not None
-    assert match_data["founder_id"] == founder.id
-    assert match_data["investor_id"] == investor.id
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["status"] == "pending"  # Should be pending (one-way like)
+        assert data["match"] is None
+
+    @pytest.mark.asyncio
+    async def test_send_like_creates_match(self):
+        """Test that mutual likes create a match."""
+        # Founder likes investor first
+        self.act_as(self.founder)
+        response1 = await self.client.post(
+            LIKES_URL,
+            json={
+                "sender_id": self.founder.id,
+                "recipient_id": self.investor.id,
+            },
+        )
+        assert response1.status_code == status.HTTP_200_OK
+        assert response1.json()["status"] == "pending"
+
+        # Investor likes founder back (should create match)
+        self.act_as(self.investor)
+        response2 = await self.client.post(
+            LIKES_URL,
+            json={
+                "sender_id": self.investor.id,
+                "recipient_id": self.founder.id,
+            },
+        )
 
+        assert response2.status_code == status.HTTP_200_OK
+        data = response2.json()
+        assert data["status"] == "matched"
+        assert data["match"] is not None
+        assert "id" in data["match"]
 
-@pytest.mark.unit
-def test_send_like_to_nonexistent_profile(client: TestClient, db_session, sample_investor_profile_data):
-    """Test sending like to non-existent profile."""
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    db_session.add(investor)
-    db_session.commit()
-    
-    response = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": investor.id,
-            "recipient_id": "nonexistent-id",
-        },
-    )
-    
-    # May return 200 if it just silently fails, or 400/500 if validated
-    # The service should handle nonexistent profiles gracefully
-    assert response.status_code in [
-        status.HTTP_200_OK,  # If it silently handles
-        status.HTTP_400_BAD_REQUEST, 
-        status.HTTP_500_INTERNAL_SERVER_ERROR
-    ]
+        # The one DB check for the like flow: the pending like above had to be
+        # stored for this like to match, and the match row is what we returned
+        match_id = self.db_session.scalar(
+            _MATCH_ID_STMT, {"founder_id": self.founder.id, "investor_id": self.investor.id}
+        )
+        assert match_id == data["match"]["id"]
+
+    @pytest.mark.asyncio
+    async def test_list_matches(self, count_queries):
+        """Test listing matches for a user."""
+        # Insert the match directly; the like flow is covered by test_send_like_creates_match
+        match_id = create_match(self.db_session, self.founder, self.investor).id
+        self.act_as(self.investor)
+
+        # List matches for investor, narrowed to the one we just created
+        with count_queries() as queries:
+            response = await self.client.get(MATCHES_URL, params={"ids": match_id})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) <= 5
+        data = response.json()
+        assert isinstance(data, list)
+        assert len(data) == 1
+        match_data = data[0]
+        assert match_data["id"] == match_id
+        assert match_data["founder_id"] == self.founder.id
+        assert match_data["investor_id"] == self.investor.id
 
 
 @pytest.mark.unit
-def test_send_like_duplicate(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test that duplicate likes are ignored."""
-    # Create profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
-    db_session.commit()
-    
-    # Send like twice
-    response1 = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": investor.id,
-            "recipient_id": founder.id,
-        },
-    )
-    assert response1.status_code == status.HTTP_200_OK
-    
-    response2 = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": investor.id,
-            "recipient_id": founder.id,
-        },
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("scenario", "allowed"),
+    [
+        # The recipient is validated before anything is stored
+        ("nonexistent", {status.HTTP_400_BAD_REQUEST}),
+        # A repeated like is ignored and stays pending
+        ("duplicate", {status.HTTP_200_OK}),
+        # Roles are not checked when liking; the like is stored as pending
+        ("same_role", {status.HTTP_200_OK}),
+    ],
+    ids=["nonexistent", "duplicate", "same_role"],
+)
+async def test_send_like_error_paths(
+    scenario: str,
+    allowed: set[int],
+    async_client: AsyncClient,
+    db_session,
+    investor: Profile,
+    founder: Profile,
+    sample_investor_profile_data,
+    act_as,
+):
+    """Test that invalid likes are handled gracefully."""
+    act_as(investor)
+    if scenario == "nonexistent":
+        recipient_id = "nonexistent-id"
+    elif scenario == "duplicate":
+        recipient_id = founder.id
+        first = await async_client.post(
+            LIKES_URL, json={"sender_id": investor.id, "recipient_id": recipient_id}
+        )
+        assert first.status_code == status.HTTP_200_OK
+    else:
+        other_investor = build_profile(sample_investor_profile_data, id=PROFILE_IDS[0], email="investor2@test.com")
+        db_session.add(other_investor)
+        db_session.commit()
+        recipient_id = other_investor.id
+
+    response = await async_client.post(
+        LIKES_URL, json={"sender_id": investor.id, "recipient_id": recipient_id}
     )
-    # Should handle duplicate gracefully
-    assert response2.status_code in [status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST]
+
+    assert response.status_code in allowed
+    if response.status_code == status.HTTP_200_OK:
+        assert response.json() == {"status": "pending", "match": None}
 
 
 @pytest.mark.unit
-def test_list_matches_empty(client: TestClient, db_session, sample_investor_profile_data):
+@pytest.mark.asyncio
+async def test_list_matches_empty(async_client: AsyncClient, investor: Profile, act_as):
     """Test listing matches when user has no matches."""
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    db_session.add(investor)
-    db_session.commit()
+    act_as(investor)
     
     # List matches for investor with no matches
-    response = client.get(f"/api/v1/matches?profile_id={investor.id}")
+    response = await async_client.get(MATCHES_URL)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -293,110 +180,57 @@ def test_list_matches_empty(client: TestClient, db_session, sample_investor_prof
 
 
 @pytest.mark.unit
-def test_list_matches_multiple(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
+@pytest.mark.asyncio
+async def test_list_matches_multiple(
+    async_client: AsyncClient, db_session, investor: Profile, sample_founder_profile_data, act_as
+):
     """Test listing multiple matches for a user."""
-    import uuid
-    investor_data = sample_investor_profile_data.copy()
-    investor_data["id"] = str(uuid.uuid4())  # Generate new ID
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    # Create two founders
-    founder1_data = sample_founder_profile_data.copy()
-    founder1_data["id"] = str(uuid.uuid4())  # Generate new ID
-    founder1_data["email"] = "founder1@test.com"
-    prompts1 = founder1_data.pop("prompts", [])
-    verification1 = founder1_data.pop("verification", {})
-    founder1 = Profile(
-        **founder1_data,
-        prompts=[{**p} for p in prompts1],
-        verification=verification1,
-    )
-    
-    founder2_data = sample_founder_profile_data.copy()
-    founder2_data["id"] = str(uuid.uuid4())  # Generate new ID
-    founder2_data["email"] = "founder2@test.com"
-    prompts2 = founder2_data.pop("prompts", [])
-    verification2 = founder2_data.pop("verification", {})
-    founder2 = Profile(
-        **founder2_data,
-        prompts=[{**p} for p in prompts2],
-        verification=verification2,
-    )
+    # Create two more founders alongside the shared investor
+    founder1 = build_profile(sample_founder_profile_data, id=PROFILE_IDS[0], email="founder1@test.com")
+    founder2 = build_profile(sample_founder_profile_data, id=PROFILE_IDS[1], email="founder2@test.com")
     
-    db_session.add(investor)
-    db_session.add(founder1)
-    db_session.add(founder2)
-    db_session.commit()
-    
-    # Create matches
-    from app.models.match import Match
+    # Create matches; everything is inserted in a single commit
     match1 = Match(founder_id=founder1.id, investor_id=investor.id, status="active")
     match2 = Match(founder_id=founder2.id, investor_id=investor.id, status="active")
-    db_session.add(match1)
-    db_session.add(match2)
+    db_session.add_all([founder1, founder2, match1, match2])
     db_session.commit()
+    act_as(investor)
     
     # List matches
-    response = client.get(f"/api/v1/matches?profile_id={investor.id}")
+    response = await async_client.get(MATCHES_URL)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert isinstance(data, list)
     assert len(data) >= 2
-    match_ids = [m["id"] for m in data]
-    assert match1.id in match_ids
-    assert match2.id in match_ids
-
-
-@pytest.mark.unit
-def test_send_like_same_role_error(client: TestClient, db_session, sample_investor_profile_data):
-    """Test that sending like between same roles fails."""
-    import uuid
-    investor1_data = sample_investor_profile_data.copy()
-    investor1_data["id"] = str(uuid.uuid4())  # Generate new ID
-    investor1_data["email"] = "investor1@test.com"
-    prompts1 = investor1_data.pop("prompts", [])
-    verification1 = investor1_data.pop("verification", {})
-    investor1 = Profile(
-        **investor1_data,
-        prompts=[{**p} for p in prompts1],
-        verification=verification1,
-    )
+    assert {match1.id, match2.id} <= {m["id"] for m in data}
     
-    investor2_data = sample_investor_profile_data.copy()
-    investor2_data["id"] = str(uuid.uuid4())  # Generate new ID
-    investor2_data["email"] = "investor2@test.com"
-    prompts2 = investor2_data.pop("prompts", [])
-    verification2 = investor2_data.pop("verification", {})
-    investor2 = Profile(
-        **investor2_data,
-        prompts=[{**p} for p in prompts2],
-        verification=verification2,
-    )
+    # Narrow to one match by ID
+    response = await async_client.get(MATCHES_URL, params={"ids": [match2.id]})
     
-    db_session.add(investor1)
-    db_session.add(investor2)
-    db_session.commit()
+    assert response.status_code == status.HTTP_200_OK
+    assert [m["id"] for m in response.json()] == [match2.id]
     
-    # Try to like another investor (should fail or be ignored)
-    response = client.post(
-        "/api/v1/matches/likes",
-        json={
-            "sender_id": investor1.id,
-            "recipient_id": investor2.id,
-        },
-    )
+    # Repeated ids narrow to exactly those matches
+    response = await async_client.get(MATCHES_URL, params={"ids": [match1.id, match2.id]})
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(m["id"] for m in response.json()) == sorted([match1.id, match2.id])
+    
+    # Unknown IDs narrow to nothing rather than being ignored
+    response = await async_client.get(MATCHES_URL, params={"ids": ["not-a-match-id"]})
     
-    # Service should handle this gracefully (may return error or ignore)
-    assert response.status_code in [
-        status.HTTP_200_OK,  # If silently ignored
-        status.HTTP_400_BAD_REQUEST,  # If validated
-        status.HTTP_500_INTERNAL_SERVER_ERROR  # If raises error
-    ]
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
 
+@pytest.mark.unit
+def test_list_matches_ids_filter(db_session, investor: Profile, founder: Profile):
+    """Test that an empty ids list means no filter rather than no results."""
+    match = create_match(db_session, founder, investor)
+    
+    everything = matching_service.list_matches(db_session, investor.id)
+    
+    assert match.id in {m.id for m in everything}
+    assert matching_service.list_matches(db_session, investor.id, ids=[]) == everything
+    assert [m.id for m in matching_service.list_matches(db_session, investor.id, ids=[match.id])] == [match.id]
@@ -2,62 +2,50 @@
 
 from __future__ import annotations
 
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlmodel import Session
 
 from app.models.match import Match
 from app.models.message import Message
 from app.models.profile import Profile
+from app.schemas.message import MessageCreate
+from app.services.messaging import messaging_service
+from tests.conftest import PROFILE_IDS, build_profile
 
+MESSAGES_URL = "/api/v1/messages"
 
-@pytest.mark.unit
-def test_create_message_success(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test creating a message in a match thread."""
-    # Create profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
-    db_session.commit()
-    
-    # Create a match
-    match = Match(
-        founder_id=founder.id,
-        investor_id=investor.id,
-        status="active",
-    )
-    db_session.add(match)
-    db_session.commit()
-    
-    # Send message
+
+def _send_message(client: TestClient, match: Match, sender: Profile, content: str) -> dict:
+    """POST a message into the match thread and return the created message."""
     response = client.post(
-        "/api/v1/messages",
+        MESSAGES_URL,
         json={
             "match_id": match.id,
-            "sender_id": investor.id,
-            "content": "Hi! I'm interested in learning more about your startup.",
+            "sender_id": sender.id,
+            "content": content,
         },
     )
-    
     assert response.status_code == status.HTTP_201_CREATED
-    data = response.json()
+    return response.json()
+
+
+def _seed_message(session: Session, match: Match, sender: Profile, content: str) -> str:
+    """Insert a message through the service layer, for flows that only read the thread."""
+    message = messaging_service.create_message(
+        session, MessageCreate(match_id=match.id, sender_id=sender.id, content=content)
+    )
+    return message.id
+
+
+def _flow_create(client: TestClient, session: Session, match: Match, investor: Profile, founder: Profile) -> None:
+    """Creating a message echoes it back with an id and timestamp."""
+    data = _send_message(client, match, investor, "Hi! I'm interested in learning more about your startup.")
+    
     assert data["content"] == "Hi! I'm interested in learning more about your startup."
     assert data["sender_id"] == investor.id
     assert data["match_id"] == match.id
@@ -65,64 +53,12 @@ def test_create_message_success(client: TestClient, db_session, sample_investor_
     assert "created_at" in data
 
 
-@pytest.mark.unit
-def test_list_messages_in_thread(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test listing messages in a match thread."""
-    # Create profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
-    db_session.commit()
-    
-    # Create match
-    match = Match(
-        founder_id=founder.id,
-        investor_id=investor.id,
-        status="active",
-    )
-    db_session.add(match)
-    db_session.commit()
+def _flow_list_thread(client: TestClient, session: Session, match: Match, investor: Profile, founder: Profile) -> None:
+    """Messages from both sides show up in the thread."""
+    _seed_message(session, match, investor, "Hello!")
+    _seed_message(session, match, founder, "Hi there!")
     
-    # Create messages via API
-    response1 = client.post(
-        "/api/v1/messages",
-        json={
-            "match_id": match.id,
-            "sender_id": investor.id,
-            "content": "Hello!",
-        },
-    )
-    assert response1.status_code == status.HTTP_201_CREATED
-    
-    response2 = client.post(
-        "/api/v1/messages",
-        json={
-            "match_id": match.id,
-            "sender_id": founder.id,
-            "content": "Hi there!",
-        },
-    )
-    assert response2.status_code == status.HTTP_201_CREATED
-    
-    # List messages
-    response = client.get(f"/api/v1/messages/{match.id}?profile_id={investor.id}")
+    response = client.get(f"{MESSAGES_URL}/{match.id}")
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -134,215 +70,149 @@ def test_list_messages_in_thread(client: TestClient, db_session, sample_investor
     assert "Hi there!" in message_contents
 
 
-@pytest.mark.unit
-def test_list_conversations(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test listing all conversation threads for a user."""
-    # Create profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
-    db_session.commit()
-    
-    # Create match
-    match = Match(
-        founder_id=founder.id,
-        investor_id=investor.id,
-        status="active",
-    )
-    db_session.add(match)
-    db_session.commit()
-    
-    # Create a message via API
-    response = client.post(
-        "/api/v1/messages",
-        json={
-            "match_id": match.id,
-            "sender_id": investor.id,
-            "content": "Hello!",
-        },
-    )
-    assert response.status_code == status.HTTP_201_CREATED
+def _flow_conversations(client: TestClient, session: Session, match: Match, investor: Profile, founder: Profile) -> None:
+    """The match appears in the sender's conversation list."""
+    _seed_message(session, match, investor, "Hello!")
     
-    # List conversations
-    response = client.get(f"/api/v1/messages?profile_id={investor.id}")
+    response = client.get(MESSAGES_URL)
     
-    if response.status_code != status.HTTP_200_OK:
-        print(f"Unexpected status: {response.status_code}")
-        print(f"Response: {response.json()}")
-    
-    assert response.status_code == status.HTTP_200_OK
+    assert response.status_code == status.HTTP_200_OK, response.json()
     data = response.json()
     assert isinstance(data, list)
-    # May have 0 conversations if something went wrong, but should not error
-    if len(data) >= 1:
-        # Find conversation with our match
-        conversation = next((c for c in data if c["match_id"] == match.id), None)
-        if conversation:
-            assert "unread_count" in conversation
-            assert "last_message_preview" in conversation
-            assert conversation["other_party_id"] == founder.id
+    conversation = {c["match_id"]: c for c in data}[match.id]
+    assert "unread_count" in conversation
+    assert conversation["last_message_preview"] == "Hello!"
+    assert conversation["other_party_id"] == founder.id
 
 
-@pytest.mark.unit
-def test_message_read_status(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test that listing messages marks them as read."""
-    # Create profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+def _flow_read_status(client: TestClient, session: Session, match: Match, investor: Profile, founder: Profile) -> None:
+    """Listing the thread marks the other party's messages as read."""
+    message_id = _seed_message(session, match, founder, "Unread message")
     
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+    # Investor lists messages (should mark as read)
+    response = client.get(f"{MESSAGES_URL}/{match.id}")
     
-    db_session.add(investor)
-    db_session.add(founder)
+    assert response.status_code == status.HTTP_200_OK
+    msg = {m["id"]: m for m in response.json()}[message_id]
+    # Since founder sent it and investor is viewing, it should be marked read
+    assert msg["read_at"] is not None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "flow",
+    [_flow_create, _flow_list_thread, _flow_conversations, _flow_read_status],
+    ids=["create", "list_thread", "conversations", "read_status"],
+)
+def test_message_flow(
+    client: TestClient, db_session, match: Match, investor: Profile, founder: Profile, act_as, flow
+):
+    """Test messaging flows inside the shared investor/founder match thread."""
+    # Every flow is driven from the investor's side
+    act_as(investor)
+    flow(client, db_session, match, investor, founder)
+
+
+@pytest.mark.unit
+def test_list_conversations_query_count(
+    client: TestClient, db_session, match: Match, investor: Profile, founder: Profile,
+    sample_founder_profile_data, count_queries, act_as,
+):
+    """Test that listing conversations costs the same number of queries for any thread count."""
+    founders = [
+        build_profile(sample_founder_profile_data, id=PROFILE_IDS[i], email=f"founder{i}@test.com")
+        for i in range(2)
+    ]
+    matches = [Match(founder_id=f.id, investor_id=investor.id, status="active") for f in founders]
+    db_session.add_all([*founders, *matches])
     db_session.commit()
+    for m, sender in zip([match, *matches], [founder, *founders]):
+        _seed_message(db_session, m, sender, f"Hello from {sender.email}")
     
-    # Create match
-    match = Match(
-        founder_id=founder.id,
-        investor_id=investor.id,
-        status="active",
-    )
-    db_session.add(match)
-    db_session.commit()
+    act_as(investor)
+    with count_queries() as queries:
+        response = client.get(MESSAGES_URL)
     
-    # Create message from founder to investor via API
-    response = client.post(
-        "/api/v1/messages",
-        json={
+    assert response.status_code == status.HTTP_200_OK
+    # The viewer's profile, then matches, other parties, latest messages and unread counts
+    assert len(queries) <= 5
+    threads = {t["match_id"]: t for t in response.json()}
+    assert len(threads) == 3
+    for m, sender in zip([match, *matches], [founder, *founders]):
+        assert threads[m.id]["last_message_preview"] == f"Hello from {sender.email}"
+        assert threads[m.id]["unread_count"] == 1
+
+
+@pytest.mark.unit
+def test_list_messages_pagination(
+    client: TestClient, db_session, match: Match, investor: Profile, founder: Profile, count_queries, act_as
+):
+    """Test listing a longer thread returns every message, oldest first."""
+    # Seed the thread in one statement; sending is covered by test_message_flow.
+    # Core inserts skip the model's default factories, so pass id/created_at.
+    start = datetime(2025, 1, 1)
+    rows = [
+        {
+            "id": f"message-{i}",
             "match_id": match.id,
-            "sender_id": founder.id,
-            "content": "Unread message",
-        },
-    )
-    assert response.status_code == status.HTTP_201_CREATED
-    message_id = response.json()["id"]
+            "sender_id": investor.id if i % 2 == 0 else founder.id,
+            "content": f"Message {i}",
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(5)
+    ]
+    db_session.execute(insert(Message), rows)
+    db_session.commit()
     
-    # Investor lists messages (should mark as read)
-    response = client.get(f"/api/v1/messages/{match.id}?profile_id={investor.id}")
+    act_as(investor)
+    with count_queries() as queries:
+        response = client.get(f"{MESSAGES_URL}/{match.id}")
     
     assert response.status_code == status.HTTP_200_OK
+    # The match, the viewer's profile, one mark-as-read UPDATE and the page itself,
+    # however many of the messages were unread
+    assert len(queries) <= 4
     data = response.json()
-    # Message should now have read_at timestamp
-    msg = next((m for m in data if m["id"] == message_id), None)
-    if msg:
-        # read_at should be set when listing messages (for messages not sent by the requester)
-        # Since founder sent it and investor is viewing, it should be marked read
-        assert msg.get("read_at") is not None
+    assert isinstance(data, list)
+    assert [m["content"] for m in data] == [f"Message {i}" for i in range(5)]
+    # Only the founder's messages are marked read for the investor
+    assert [m["read_at"] is not None for m in data] == [i % 2 == 1 for i in range(5)]
 
 
 @pytest.mark.unit
-def test_create_message_invalid_match(client: TestClient, db_session, sample_investor_profile_data):
-    """Test creating message with invalid match ID."""
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    db_session.add(investor)
-    db_session.commit()
-    
-    response = client.post(
-        "/api/v1/messages",
-        json={
-            "match_id": "nonexistent-match-id",
-            "sender_id": investor.id,
-            "content": "Hello",
-        },
-    )
-    
-    assert response.status_code in [
-        status.HTTP_400_BAD_REQUEST,
-        status.HTTP_404_NOT_FOUND,
-        status.HTTP_500_INTERNAL_SERVER_ERROR
-    ]
+@pytest.mark.parametrize(
+    ("method", "path", "json_body"),
+    [
+        ("POST", MESSAGES_URL, {"match_id": "nonexistent-match-id", "content": "Hello"}),
+        ("GET", f"{MESSAGES_URL}/nonexistent-match-id", None),
+    ],
+    ids=["create_message", "list_messages"],
+)
+def test_invalid_match_id(client: TestClient, investor: Profile, act_as, method, path, json_body):
+    """Test that an unknown match ID is rejected, without seeding any rows."""
+    act_as(investor)
+    response = client.request(method, path, json=json_body)
+    
+    # sender_id is optional in the body, so both requests reach the match lookup
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["error"] == "Match not found"
 
 
 @pytest.mark.unit
-def test_create_message_unauthorized_sender(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
+def test_create_message_unauthorized_sender(
+    client: TestClient, db_session, match: Match, sample_investor_profile_data, act_as
+):
     """Test creating message when sender is not part of match."""
-    import uuid
-    investor_data = sample_investor_profile_data.copy()
-    investor_data["id"] = str(uuid.uuid4())  # Generate new ID
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    founder_data["id"] = str(uuid.uuid4())  # Generate new ID
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
     # Create another investor
-    investor2_data = sample_investor_profile_data.copy()
-    investor2_data["id"] = str(uuid.uuid4())  # Generate new ID
-    investor2_data["email"] = "investor2@test.com"
-    prompts2 = investor2_data.pop("prompts", [])
-    verification2 = investor2_data.pop("verification", {})
-    investor2 = Profile(
-        **investor2_data,
-        prompts=[{**p} for p in prompts2],
-        verification=verification2,
-    )
+    investor2 = build_profile(sample_investor_profile_data, id=PROFILE_IDS[0], email="investor2@test.com")
     
-    db_session.add(investor)
-    db_session.add(founder)
     db_session.add(investor2)
     db_session.commit()
     
-    # Create match between investor and founder
-    match = Match(
-        founder_id=founder.id,
-        investor_id=investor.id,
-        status="active",
-    )
-    db_session.add(match)
-    db_session.commit()
-    
     # Try to send message as investor2 (not part of match)
+    act_as(investor2)
     response = client.post(
-        "/api/v1/messages",
+        MESSAGES_URL,
         json={
             "match_id": match.id,
             "sender_id": investor2.id,
@@ -350,108 +220,22 @@ def test_create_message_unauthorized_sender(client: TestClient, db_session, samp
         },
     )
     
-    assert response.status_code in [
-        status.HTTP_400_BAD_REQUEST,
-        status.HTTP_403_FORBIDDEN,
-        status.HTTP_500_INTERNAL_SERVER_ERROR
-    ]
-
-
-@pytest.mark.unit
-def test_list_messages_pagination(client: TestClient, db_session, sample_investor_profile_data, sample_founder_profile_data):
-    """Test listing messages with pagination."""
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    db_session.add(investor)
-    db_session.add(founder)
-    db_session.commit()
-    
-    # Create match
-    match = Match(
-        founder_id=founder.id,
-        investor_id=investor.id,
-        status="active",
-    )
-    db_session.add(match)
-    db_session.commit()
-    
-    # Create multiple messages
-    for i in range(5):
-        client.post(
-            "/api/v1/messages",
-            json={
-                "match_id": match.id,
-                "sender_id": investor.id if i % 2 == 0 else founder.id,
-                "content": f"Message {i}",
-            },
-        )
-    
-    # List messages
-    response = client.get(f"/api/v1/messages/{match.id}?profile_id={investor.id}")
-    
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert isinstance(data, list)
-    assert len(data) >= 5
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["error"] == "Sender is not part of this match"
 
 
 @pytest.mark.unit
-def test_list_conversations_empty(client: TestClient, db_session, sample_investor_profile_data):
+def test_list_conversations_empty(client: TestClient, db_session, sample_investor_profile_data, act_as):
     """Test listing conversations when user has no matches."""
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    db_session.add(investor)
+    # The shared investor may already hold this module's match, so use a fresh one
+    loner = build_profile(sample_investor_profile_data, id=PROFILE_IDS[0], email="loner@test.com")
+    db_session.add(loner)
     db_session.commit()
     
-    response = client.get(f"/api/v1/messages?profile_id={investor.id}")
+    act_as(loner)
+    response = client.get(MESSAGES_URL)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert isinstance(data, list)
     assert len(data) == 0
-
-
-@pytest.mark.unit
-def test_list_messages_invalid_match(client: TestClient, db_session, sample_investor_profile_data):
-    """Test listing messages for invalid match."""
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    db_session.add(investor)
-    db_session.commit()
-    
-    response = client.get("/api/v1/messages/nonexistent-match-id?profile_id={investor.id}")
-    
-    assert response.status_code in [
-        status.HTTP_400_BAD_REQUEST,
-        status.HTTP_404_NOT_FOUND,
-        status.HTTP_500_INTERNAL_SERVER_ERROR
-    ]
-
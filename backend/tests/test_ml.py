@@ -2,27 +2,104 @@
 
 from __future__ import annotations
 
+from typing import Generator
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, MagicMock
 from fastapi import status
 from fastapi.testclient import TestClient
+from sqlmodel import Session
 
-from app.services.ml.embeddings import EmbeddingService, get_embedding_service
+from app.core.config import settings
+from app.models.profile import Profile
+from app.services.ml.embeddings import EmbeddingService, get_embedding_service, profile_to_text
 from app.services.ml.recommendation import RecommendationEngine, get_recommendation_engine
 from app.services.ml.ranking import RerankingService, get_reranking_service
 
 
+# Canned 384-dim vectors for the mocked endpoint tests, built once at import.
+# Tuples, so no test can mutate what another one returns.
+_EMB_A = (0.1,) * 384
+_EMB_B = (0.2,) * 384
+_EMB_C = (0.3,) * 384
+_EMB_D = (0.4,) * 384
+
+
+@pytest.fixture(scope="module")
+def ml_profile_pair(db_connection) -> Generator[tuple[str, str], None, None]:
+    """Insert an investor/founder pair with overlapping AI/healthcare focus once per module.
+    
+    Same SAVEPOINT layering as conftest's seeded_profiles: the rows are rolled
+    back when the module finishes.
+    """
+    savepoint = db_connection.begin_nested()
+    session = Session(bind=db_connection, join_transaction_mode="create_savepoint")
+    investor = Profile(
+        role="investor",
+        full_name="Investor A",
+        email="ml-investor@test.com",
+        headline="Looking for AI healthcare startups",
+        verification={"soft_verified": False},
+        focus_sectors=["AI", "Healthcare"],
+    )
+    founder = Profile(
+        role="founder",
+        full_name="Founder B",
+        email="ml-founder@test.com",
+        headline="AI healthcare startup",
+        verification={"soft_verified": False},
+        focus_sectors=["AI", "Healthcare"],
+    )
+    session.add_all([investor, founder])
+    session.commit()
+    ids = (investor.id, founder.id)
+    session.close()
+    
+    yield ids
+    
+    savepoint.rollback()
+
+
+@pytest.fixture(scope="session")
+def warm_embedding_service() -> None:
+    """Load the real model and run one inference before the first slow test.
+    
+    Keeps the model load off whichever real-model test happens to run first.
+    A no-op when ML is disabled or the [ml] extra isn't installed.
+    """
+    if not settings.ml_enabled:
+        return
+    service = get_embedding_service()
+    if service.is_available():
+        service.embed_text("warmup", use_cache=False)
+
+
+@pytest.fixture
+def enabled_embedding_service(monkeypatch) -> Mock:
+    """Turn ML on and route the endpoints to a mock embedding service.
+    
+    The service reports itself available; tests set return values on it, or
+    flip ``is_available`` to exercise the degraded paths.
+    """
+    service = Mock()
+    service.is_available.return_value = True
+    monkeypatch.setattr("app.core.config.settings.ml_enabled", True)
+    monkeypatch.setattr("app.services.ml.embeddings.get_embedding_service", lambda: service)
+    return service
+
+
 @pytest.mark.unit
 class TestEmbeddingService:
     """Unit tests for EmbeddingService."""
 
-    def test_embedding_service_initialization_without_model(self):
+    def test_embedding_service_initialization_without_model(self, monkeypatch):
         """Test that service initializes gracefully when models not available."""
-        with patch('app.services.ml.embeddings.SENTENCE_TRANSFORMERS_AVAILABLE', False):
-            service = EmbeddingService()
-            assert service.model is None
-            assert service.device == "cpu"
-            assert not service.is_available()
+        monkeypatch.setattr("app.services.ml.embeddings.SENTENCE_TRANSFORMERS_AVAILABLE", False)
+        
+        service = EmbeddingService()
+        assert service.model is None
+        assert service.device == "cpu"
+        assert not service.is_available()
 
     def test_embed_text_returns_zero_vector_when_unavailable(self):
         """Test that embed_text returns zero vector when model unavailable."""
@@ -33,38 +110,34 @@ class TestEmbeddingService:
         assert len(result) == 384
         assert all(x == 0.0 for x in result)
 
-    def test_embed_text_with_mock_model(self):
+    def test_embed_text_with_mock_model(self, mock_encoder):
         """Test embed_text with mocked model."""
-        try:
-            import numpy as np
-            mock_array = np.array([0.1] * 384)
-        except ImportError:
-            # Fallback if numpy not available - just test that it returns a list
-            mock_array = [0.1] * 384
-        
-        mock_model = MagicMock()
-        mock_model.encode.return_value = mock_array
-        
         service = EmbeddingService()
-        service.model = mock_model
+        service.model = mock_encoder
         
         result = service.embed_text("test", use_cache=False)
         
-        mock_model.encode.assert_called_once()
+        mock_encoder.encode.assert_called_once()
         assert len(result) == 384
         assert isinstance(result, list)
 
-    def test_embed_batch_with_mock_model(self):
-        """Test embed_batch with mocked model."""
-        try:
-            import numpy as np
-            mock_array = np.array([[0.1] * 384, [0.2] * 384])
-        except ImportError:
-            # Fallback if numpy not available
-            mock_array = [[0.1] * 384, [0.2] * 384]
+    def test_embed_text_np_keeps_float32_array(self, mock_encoder, mock_encoding_384):
+        """Test embed_text_np hands back the model's float32 array without a list round trip."""
+        import numpy as np
+        
+        service = EmbeddingService()
+        service.model = mock_encoder
         
+        result = service.embed_text_np("test", use_cache=False)
+        
+        assert isinstance(result, np.ndarray)
+        assert result.dtype == np.float32
+        assert np.array_equal(result, mock_encoding_384)
+
+    def test_embed_batch_with_mock_model(self, mock_encoding_batch_384):
+        """Test embed_batch with mocked model."""
         mock_model = MagicMock()
-        mock_model.encode.return_value = mock_array
+        mock_model.encode.return_value = mock_encoding_batch_384
         
         service = EmbeddingService()
         service.model = mock_model
@@ -76,26 +149,35 @@ class TestEmbeddingService:
         assert len(result[0]) == 384
         assert isinstance(result, list)
 
+    def test_embed_batch_encodes_duplicates_once(self, mock_encoding_batch_384):
+        """Test that repeated texts are encoded once and fanned back out in input order."""
+        mock_model = MagicMock()
+        mock_model.encode.return_value = mock_encoding_batch_384
+        
+        service = EmbeddingService()
+        service.model = mock_model
+        
+        result = service.embed_batch_np(["a", "b", "a"])
+        
+        assert mock_model.encode.call_args.args[0] == ["a", "b"]
+        assert result.shape == (3, 384)
+        assert (result[0] == result[2]).all()
+        assert (result[1] == mock_encoding_batch_384[1]).all()
+
     def test_embed_batch_empty_list(self):
         """Test embed_batch with empty list."""
         service = EmbeddingService()
         result = service.embed_batch([])
         assert result == []
 
-    def test_embed_profile_text_caching(self, redis_client):
-        """Test that profile embeddings are cached and reused."""
+    def test_embed_profile_text_caching(self, redis_client, mock_encoder):
+        """Test that profile embeddings are cached (as float32 bytes) and reused."""
+        import numpy as np
+        
         from app.core.cache import cache_service
         
         service = EmbeddingService()
-        try:
-            import numpy as np
-            mock_array = np.array([0.1] * 384)
-        except ImportError:
-            mock_array = [0.1] * 384
-        
-        mock_model = MagicMock()
-        mock_model.encode.return_value = mock_array
-        service.model = mock_model
+        service.model = mock_encoder
         
         profile_data = {
             "id": "test-profile-id",
@@ -116,20 +198,63 @@ class TestEmbeddingService:
         result1 = service.embed_profile_text(profile_data, profile_id="test-profile-id", use_cache=True)
         assert len(result1) == 384
         
-        # Verify cache was set
-        cached = cache_service.get(cache_key)
+        # Verify cache was set, as a header plus 384 raw float32s rather than JSON
+        cached = cache_service.get_embedding(cache_key)
         assert cached is not None
-        assert cached == result1
+        assert cached.dtype == np.float32
+        assert cached.nbytes == 384 * 4
+        assert np.allclose(cached, result1)
         
         # Second call - should use cache
         result2 = service.embed_profile_text(profile_data, profile_id="test-profile-id", use_cache=True)
         assert len(result2) == 384
         assert result1 == result2
+        mock_encoder.encode.assert_called_once()
         
         # Verify cache is still there
-        cached_again = cache_service.get(cache_key)
+        cached_again = cache_service.get_embedding(cache_key)
         assert cached_again is not None
-        assert cached_again == result1
+        assert np.allclose(cached_again, result1)
+
+    def test_embed_text_memory_cache_skips_encode(self, mock_encoder):
+        """Test that a repeated text is served in-process, even with Redis unreachable."""
+        service = EmbeddingService()
+        service.model = mock_encoder
+        
+        first = service.embed_text_np("hello")
+        second = service.embed_text_np("hello")
+        
+        mock_encoder.encode.assert_called_once()
+        assert second is first
+        assert not second.flags.writeable
+
+    def test_text_embedding_cache_is_scoped_to_model(self, redis_client, mock_encoder):
+        """Test that cached text embeddings are shared per model, never across models."""
+        first = EmbeddingService()
+        first.model = mock_encoder
+        first.embed_text_np("hello")
+        
+        second = EmbeddingService()
+        second.model = mock_encoder
+        second.embed_text_np("hello")
+        assert mock_encoder.encode.call_count == 1  # served from the cache
+        
+        second.model_name = "all-mpnet-base-v2"
+        second.embed_text_np("hello")
+        assert mock_encoder.encode.call_count == 2
+
+    def test_text_embedding_cache_is_scoped_to_backend(self, redis_client, mock_encoder):
+        """Test that a quantized ONNX export doesn't reuse the torch model's cached vectors."""
+        torch_service = EmbeddingService()
+        torch_service.model = mock_encoder
+        torch_service.embed_text_np("hello")
+
+        onnx_service = EmbeddingService()
+        onnx_service.model = mock_encoder
+        onnx_service.backend = "onnx"
+        onnx_service.model_file = "onnx/model_qint8_avx2.onnx"
+        onnx_service.embed_text_np("hello")
+        assert mock_encoder.encode.call_count == 2
 
     def test_embed_profile_text_combines_fields(self):
         """Test that embed_profile_text combines profile fields correctly."""
@@ -150,43 +275,40 @@ class TestEmbeddingService:
         result = service.embed_profile_text(profile_data, profile_id="test-id")
         assert len(result) == 384
 
-    def test_compute_similarity_same_embeddings(self):
-        """Test that identical embeddings return similarity of 1.0."""
-        service = EmbeddingService()
-        
-        embedding = [0.5] * 384
-        similarity = service.compute_similarity(embedding, embedding)
-        
-        # Should be close to 1.0 for identical normalized vectors
-        assert abs(similarity - 1.0) < 0.01
-
-    def test_compute_similarity_orthogonal_embeddings(self):
-        """Test that orthogonal embeddings return similarity close to 0."""
-        service = EmbeddingService()
-        
-        # Create orthogonal vectors (one has all 1s, other has all 0s)
-        embedding1 = [1.0] * 384
-        embedding2 = [0.0] * 384
-        
-        similarity = service.compute_similarity(embedding1, embedding2)
-        assert similarity == 0.0
-
-    def test_compute_similarity_dimension_mismatch(self):
-        """Test that dimension mismatch returns 0.0."""
-        service = EmbeddingService()
-        
-        embedding1 = [0.1] * 384
-        embedding2 = [0.2] * 100  # Different dimension
-        
-        similarity = service.compute_similarity(embedding1, embedding2)
-        assert similarity == 0.0
-
-    def test_compute_similarity_empty_embeddings(self):
-        """Test that empty embeddings return 0.0."""
-        service = EmbeddingService()
+    def test_profile_to_text_joins_fields_in_order(self):
+        """Test the text both the single and batch profile-embedding paths feed the model."""
+        profile_data = {
+            "full_name": "John Doe",
+            "headline": "CEO",
+            "location": None,
+            "role": "investor",
+            "firm": "Test VC",
+            "focus_sectors": ["AI", "SaaS"],
+            "prompts": [{"content": "I love startups"}, {"content": ""}, "not-a-dict"],
+        }
         
-        similarity = service.compute_similarity([], [])
-        assert similarity == 0.0
+        assert profile_to_text(profile_data) == "John Doe CEO I love startups Test VC AI SaaS"
+
+    @pytest.fixture(scope="class")
+    def service(self):
+        """One EmbeddingService shared by the pure compute_similarity checks."""
+        return EmbeddingService()
+
+    @pytest.mark.parametrize(
+        ("embedding1", "embedding2", "expected"),
+        [
+            # Identical vectors -> close to 1.0
+            ([0.5] * 384, [0.5] * 384, pytest.approx(1.0, abs=0.01)),
+            # A zero vector has no direction -> 0.0
+            ([1.0] * 384, [0.0] * 384, 0.0),
+            ([0.1] * 384, [0.2] * 100, 0.0),
+            ([], [], 0.0),
+        ],
+        ids=["same", "zero_vector", "dimension_mismatch", "empty"],
+    )
+    def test_compute_similarity(self, service, embedding1, embedding2, expected):
+        """Test compute_similarity on identical, zero, mismatched and empty embeddings."""
+        assert service.compute_similarity(embedding1, embedding2) == expected
 
 
 @pytest.mark.unit
@@ -198,30 +320,54 @@ class TestRecommendationEngine:
         engine = RecommendationEngine()
         assert engine.embedding_service is not None
 
-    def test_compute_profile_similarity_unavailable(self):
+    def test_compute_profile_similarity_unavailable(self, monkeypatch):
         """Test similarity computation when ML unavailable."""
         engine = RecommendationEngine()
+        monkeypatch.setattr("app.core.config.settings.ml_enabled", False)
         
-        with patch('app.core.config.settings.ml_enabled', False):
-            result = engine.compute_profile_similarity({}, {})
-            assert result == 0.0
+        result = engine.compute_profile_similarity({}, {})
+        assert result == 0.0
 
-    def test_compute_profile_similarity_with_mock(self):
+    def test_compute_profile_similarity_with_mock(self, monkeypatch):
         """Test profile similarity with mocked embedding service."""
         engine = RecommendationEngine()
         
         mock_embedding = [0.5] * 384
         engine.embedding_service = Mock()
         engine.embedding_service.is_available.return_value = True
-        engine.embedding_service.embed_profile_text.return_value = mock_embedding
+        engine.embedding_service.embed_profile_np.return_value = mock_embedding
         engine.embedding_service.compute_similarity.return_value = 0.75
+        monkeypatch.setattr("app.core.config.settings.ml_enabled", True)
+        
+        profile_a = {"id": "a", "full_name": "A"}
+        profile_b = {"id": "b", "full_name": "B"}
         
-        with patch('app.core.config.settings.ml_enabled', True):
-            profile_a = {"id": "a", "full_name": "A"}
-            profile_b = {"id": "b", "full_name": "B"}
-            
-            result = engine.compute_profile_similarity(profile_a, profile_b)
-            assert result == 0.75
+        result = engine.compute_profile_similarity(profile_a, profile_b)
+        assert result == 0.75
+
+    def test_compute_profile_similarities_matches_pairwise(self, redis_client, monkeypatch):
+        """Test that the batched scores equal one compute_similarity call per candidate."""
+        np = pytest.importorskip("numpy")
+        rng = np.random.default_rng(0)
+        current = rng.standard_normal(384).astype(np.float32)
+        candidates = rng.standard_normal((3, 384)).astype(np.float32)
+        candidates[2] = 0.0  # empty profile -> zero vector
+        
+        engine = RecommendationEngine()
+        engine.embedding_service = Mock()
+        engine.embedding_service.is_available.return_value = True
+        engine.embedding_service.embed_profile_np.return_value = current
+        engine.embedding_service.embed_batch_np.return_value = candidates
+        monkeypatch.setattr("app.core.config.settings.ml_enabled", True)
+        
+        result = engine.compute_profile_similarities(
+            {"id": "current"}, [{"id": "1"}, {"id": "2"}, {"id": "3"}]
+        )
+        
+        expected = [EmbeddingService().compute_similarity(current, row) for row in candidates]
+        assert result == pytest.approx(expected, abs=1e-5)
+        assert result[2] == 0.0
+        engine.embedding_service.embed_batch_np.assert_called_once()
 
     def test_rank_candidates_empty_list(self):
         """Test ranking with empty candidate list."""
@@ -229,17 +375,17 @@ class TestRecommendationEngine:
         result = engine.rank_candidates({}, [])
         assert result == []
 
-    def test_rank_candidates_unavailable(self):
+    def test_rank_candidates_unavailable(self, monkeypatch):
         """Test ranking when ML unavailable."""
         engine = RecommendationEngine()
         engine.embedding_service = Mock()
         engine.embedding_service.is_available.return_value = False
+        monkeypatch.setattr("app.core.config.settings.ml_enabled", True)
         
-        with patch('app.core.config.settings.ml_enabled', True):
-            candidates = [{"id": "1"}, {"id": "2"}]
-            result = engine.rank_candidates({}, candidates, limit=1)
-            assert len(result) == 1
-            assert result[0][1] == 0.0  # Score is 0.0
+        candidates = [{"id": "1"}, {"id": "2"}]
+        result = engine.rank_candidates({}, candidates, limit=1)
+        assert len(result) == 1
+        assert result[0][1] == 0.0  # Score is 0.0
 
 
 @pytest.mark.unit
@@ -257,13 +403,13 @@ class TestRerankingService:
         result = service.rerank_profiles({}, [])
         assert result == []
 
-    def test_rerank_profiles_combines_signals(self):
+    def test_rerank_profiles_combines_signals(self, monkeypatch):
         """Test that reranking combines similarity, diligence, and engagement."""
         service = RerankingService()
         
         # Mock recommendation engine
         service.recommendation_engine = Mock()
-        service.recommendation_engine.compute_profile_similarity.return_value = 0.8
+        service.recommendation_engine.compute_profile_similarities.return_value = [0.8, 0.8]
         
         current_profile = {"id": "current"}
         candidates = [
@@ -272,20 +418,20 @@ class TestRerankingService:
         ]
         diligence_scores = {"1": 0.9, "2": 0.7}
         
-        with patch('app.core.config.settings') as mock_settings:
-            mock_settings.ml_similarity_weight = 0.6
-            mock_settings.ml_diligence_weight = 0.3
-            mock_settings.ml_engagement_weight = 0.1
-            
-            result = service.rerank_profiles(
-                current_profile,
-                candidates,
-                diligence_scores=diligence_scores,
-            )
-            
-            assert len(result) == 2
-            # Should be sorted by score (descending)
-            assert result[0][1] >= result[1][1]
+        monkeypatch.setattr("app.core.config.settings.ml_similarity_weight", 0.6)
+        monkeypatch.setattr("app.core.config.settings.ml_diligence_weight", 0.3)
+        monkeypatch.setattr("app.core.config.settings.ml_engagement_weight", 0.1)
+        
+        result = service.rerank_profiles(
+            current_profile,
+            candidates,
+            diligence_scores=diligence_scores,
+        )
+        
+        assert len(result) == 2
+        # Same similarity, so the higher diligence score ranks first
+        assert [profile["id"] for profile, _ in result] == ["1", "2"]
+        assert result[0][1] == pytest.approx(0.8 * 0.6 + 0.9 * 0.3)
 
     def test_compute_match_reasons(self):
         """Test match reasons generation."""
@@ -330,163 +476,136 @@ class TestMLEndpoints:
             assert "embedding_dimension" in data
             assert data["status"] == "ready"
 
-    def test_ml_health_check_disabled(self, client: TestClient):
+    def test_ml_health_check_disabled(self, client: TestClient, monkeypatch):
         """Test ML health check when ML is disabled."""
-        with patch('app.core.config.settings.ml_enabled', False):
-            response = client.get("/api/v1/ml/health")
-            assert response.status_code == status.HTTP_200_OK
-            data = response.json()
-            assert data["ml_enabled"] is False
-            assert data["status"] == "unavailable"
+        monkeypatch.setattr("app.core.config.settings.ml_enabled", False)
+        
+        response = client.get("/api/v1/ml/health")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["ml_enabled"] is False
+        assert data["status"] == "unavailable"
 
-    def test_ml_health_check_enabled_unavailable(self, client: TestClient):
+    def test_ml_health_check_enabled_unavailable(self, client: TestClient, enabled_embedding_service):
         """Test ML health check when enabled but service unavailable."""
-        with patch('app.core.config.settings.ml_enabled', True):
-            with patch('app.services.ml.embeddings.get_embedding_service') as mock_get:
-                mock_service = Mock()
-                mock_service.is_available.return_value = False
-                mock_get.return_value = mock_service
-                
-                response = client.get("/api/v1/ml/health")
-                assert response.status_code == status.HTTP_200_OK
-                data = response.json()
-                assert data["ml_enabled"] is True
-                assert data["embedding_service_available"] is False
-                assert data["status"] == "degraded"
-
-    def test_generate_embedding_unavailable(self, client: TestClient):
+        enabled_embedding_service.is_available.return_value = False
+        
+        response = client.get("/api/v1/ml/health")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["ml_enabled"] is True
+        assert data["embedding_service_available"] is False
+        assert data["status"] == "degraded"
+
+    def test_generate_embedding_unavailable(self, client: TestClient, enabled_embedding_service):
         """Test embedding endpoint when service unavailable."""
-        with patch('app.core.config.settings.ml_enabled', True):
-            with patch('app.services.ml.embeddings.get_embedding_service') as mock_get:
-                mock_service = Mock()
-                mock_service.is_available.return_value = False
-                mock_get.return_value = mock_service
-                
-                response = client.post(
-                    "/api/v1/ml/embeddings",
-                    json={"text": "test"},
-                )
-                assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
-
-    def test_generate_embedding_success(self, client: TestClient):
+        enabled_embedding_service.is_available.return_value = False
+        
+        response = client.post(
+            "/api/v1/ml/embeddings",
+            json={"text": "test"},
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_generate_embedding_success(self, client: TestClient, enabled_embedding_service):
         """Test successful embedding generation."""
-        with patch('app.core.config.settings.ml_enabled', True):
-            with patch('app.services.ml.embeddings.get_embedding_service') as mock_get:
-                mock_service = Mock()
-                mock_service.is_available.return_value = True
-                mock_service.embed_text.return_value = [0.1] * 384
-                mock_get.return_value = mock_service
-                
-                response = client.post(
-                    "/api/v1/ml/embeddings",
-                    json={"text": "test"},
-                )
-                assert response.status_code == status.HTTP_200_OK
-                data = response.json()
-                assert "embedding" in data
-                assert len(data["embedding"]) == 384
-                assert data["dimension"] == 384
-
-    def test_compute_similarity_success(self, client: TestClient):
+        enabled_embedding_service.embed_text.return_value = _EMB_A
+        
+        response = client.post(
+            "/api/v1/ml/embeddings",
+            json={"text": "test"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert "embedding" in data
+        assert len(data["embedding"]) == 384
+        assert data["dimension"] == 384
+
+    def test_compute_similarity_success(self, client: TestClient, enabled_embedding_service):
         """Test successful similarity computation."""
-        with patch('app.core.config.settings.ml_enabled', True):
-            with patch('app.services.ml.embeddings.get_embedding_service') as mock_get:
-                mock_service = Mock()
-                mock_service.is_available.return_value = True
-                mock_service.embed_text.side_effect = [[0.1] * 384, [0.2] * 384]
-                mock_service.compute_similarity.return_value = 0.75
-                mock_get.return_value = mock_service
-                
-                response = client.post(
-                    "/api/v1/ml/similarity",
-                    json={"text1": "test1", "text2": "test2"},
-                )
-                assert response.status_code == status.HTTP_200_OK
-                data = response.json()
-                assert "similarity" in data
-                assert 0.0 <= data["similarity"] <= 1.0
-
-    def test_batch_embeddings_success(self, client: TestClient):
+        enabled_embedding_service.embed_text.side_effect = [_EMB_A, _EMB_B]
+        enabled_embedding_service.compute_similarity.return_value = 0.75
+        
+        response = client.post(
+            "/api/v1/ml/similarity",
+            json={"text1": "test1", "text2": "test2"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert "similarity" in data
+        assert 0.0 <= data["similarity"] <= 1.0
+
+    def test_batch_embeddings_success(self, client: TestClient, enabled_embedding_service):
         """Test successful batch embedding generation."""
-        with patch('app.core.config.settings.ml_enabled', True):
-            with patch('app.services.ml.embeddings.get_embedding_service') as mock_get:
-                mock_service = Mock()
-                mock_service.is_available.return_value = True
-                mock_service.embed_batch.return_value = [[0.1] * 384, [0.2] * 384]
-                mock_get.return_value = mock_service
-                
-                response = client.post(
-                    "/api/v1/ml/embeddings/batch",
-                    json={"texts": ["text1", "text2"]},
-                )
-                assert response.status_code == status.HTTP_200_OK
-                data = response.json()
-                assert len(data["embeddings"]) == 2
-                assert data["count"] == 2
-
-    def test_batch_similarity_success(self, client: TestClient):
+        enabled_embedding_service.embed_batch.return_value = [_EMB_A, _EMB_B]
+        
+        response = client.post(
+            "/api/v1/ml/embeddings/batch",
+            json={"texts": ["text1", "text2"]},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data["embeddings"]) == 2
+        assert data["count"] == 2
+
+    def test_batch_similarity_success(self, client: TestClient, enabled_embedding_service):
         """Test successful batch similarity computation."""
-        with patch('app.core.config.settings.ml_enabled', True):
-            with patch('app.services.ml.embeddings.get_embedding_service') as mock_get:
-                mock_service = Mock()
-                mock_service.is_available.return_value = True
-                # Text deduplication means we need embeddings for unique texts only
-                # Pairs: (a,b) and (c,d) = 4 unique texts: a, b, c, d
-                mock_service.embed_batch.return_value = [
-                    [0.1] * 384,  # a
-                    [0.2] * 384,  # b
-                    [0.3] * 384,  # c
-                    [0.4] * 384,  # d
+        # Pairs: (a,b) and (c,d) = 4 unique texts: a, b, c, d
+        enabled_embedding_service.embed_batch_np.return_value = [
+            _EMB_A,  # a
+            _EMB_B,  # b
+            _EMB_C,  # c
+            _EMB_D,  # d
+        ]
+        enabled_embedding_service.compute_similarity.return_value = 0.75
+        
+        response = client.post(
+            "/api/v1/ml/similarity/batch",
+            json={
+                "pairs": [
+                    {"text1": "a", "text2": "b"},
+                    {"text1": "c", "text2": "d"},
                 ]
-                mock_service.compute_similarity.return_value = 0.75
-                mock_get.return_value = mock_service
-                
-                response = client.post(
-                    "/api/v1/ml/similarity/batch",
-                    json={
-                        "pairs": [
-                            {"text1": "a", "text2": "b"},
-                            {"text1": "c", "text2": "d"},
-                        ]
-                    },
-                )
-                assert response.status_code == status.HTTP_200_OK
-                data = response.json()
-                # Should get 2 results (one per pair)
-                assert len(data["results"]) >= 1  # At least 1 result
-
-    def test_rank_candidates_real(self, client: TestClient, db_session):
-        """Test ranking endpoint with real ML service (if available)."""
-        from app.models.profile import Profile
-        
-        # Create test profiles
-        current_profile = Profile(
-            role="investor",
-            full_name="Test Investor",
-            email="current@test.com",
-            headline="Looking for AI startups",
-            verification={"soft_verified": False},
-            focus_sectors=["AI", "Healthcare"],
+            },
         )
-        candidate_profile = Profile(
-            role="founder",
-            full_name="Test Founder",
-            email="candidate@test.com",
-            headline="AI healthcare startup",
-            verification={"soft_verified": False},
-            focus_sectors=["AI", "Healthcare"],
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data["results"]) == 2
+        enabled_embedding_service.embed_batch_np.assert_called_once_with(["a", "b", "c", "d"])
+
+    def test_batch_similarity_embeds_shared_text_once(self, client: TestClient, enabled_embedding_service):
+        """Test that a text appearing in several pairs is embedded only once."""
+        enabled_embedding_service.embed_batch_np.return_value = [
+            _EMB_A,  # x
+            _EMB_B,  # y
+            _EMB_C,  # z
+        ]
+        enabled_embedding_service.compute_similarity.return_value = 0.75
+        
+        response = client.post(
+            "/api/v1/ml/similarity/batch",
+            json={
+                "pairs": [
+                    {"text1": "x", "text2": "y"},
+                    {"text1": "x", "text2": "z"},
+                ]
+            },
         )
-        db_session.add(current_profile)
-        db_session.add(candidate_profile)
-        db_session.commit()
-        db_session.refresh(current_profile)
-        db_session.refresh(candidate_profile)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["results"]) == 2
+        enabled_embedding_service.embed_batch_np.assert_called_once_with(["x", "y", "z"])
+
+    @pytest.mark.slow
+    @pytest.mark.usefixtures("warm_embedding_service")
+    def test_rank_candidates_real(self, client: TestClient, ml_profile_pair):
+        """Test ranking endpoint with real ML service (if available)."""
+        current_id, candidate_id = ml_profile_pair
         
         response = client.post(
             "/api/v1/ml/profiles/rank",
             json={
-                "profile_id": current_profile.id,
-                "candidate_ids": [candidate_profile.id],
+                "profile_id": current_id,
+                "candidate_ids": [candidate_id],
             },
         )
         
@@ -509,6 +628,8 @@ class TestMLEndpoints:
             error_data = response.json()
             print(f"500 Error in rank_candidates: {error_data}")
 
+    @pytest.mark.slow
+    @pytest.mark.usefixtures("warm_embedding_service")
     def test_generate_embedding_real(self, client: TestClient):
         """Test embedding generation with real ML service (if available)."""
         response = client.post(
@@ -529,6 +650,8 @@ class TestMLEndpoints:
             assert len(data["embedding"]) == data["dimension"]
             assert data["dimension"] == 384  # all-MiniLM-L6-v2 dimension
 
+    @pytest.mark.slow
+    @pytest.mark.usefixtures("warm_embedding_service")
     def test_compute_similarity_real(self, client: TestClient):
         """Test similarity computation with real ML service (if available)."""
         response = client.post(
@@ -553,6 +676,8 @@ class TestMLEndpoints:
             # Similar texts should have high similarity
             assert data["similarity"] > 0.5
 
+    @pytest.mark.slow
+    @pytest.mark.usefixtures("warm_embedding_service")
     def test_batch_embeddings_real(self, client: TestClient):
         """Test batch embedding generation with real ML service (if available)."""
         response = client.post(
@@ -579,6 +704,8 @@ class TestMLEndpoints:
             assert data["count"] == 3
             assert all(len(emb) == 384 for emb in data["embeddings"])
 
+    @pytest.mark.slow
+    @pytest.mark.usefixtures("warm_embedding_service")
     def test_batch_similarity_real(self, client: TestClient):
         """Test batch similarity computation with real ML service (if available)."""
         response = client.post(
@@ -610,37 +737,17 @@ class TestMLEndpoints:
             assert data["results"][0]["similarity"] > data["results"][2]["similarity"]
             assert data["results"][1]["similarity"] > data["results"][2]["similarity"]
 
-    def test_profile_similarity_real(self, client: TestClient, db_session):
+    @pytest.mark.slow
+    @pytest.mark.usefixtures("warm_embedding_service")
+    def test_profile_similarity_real(self, client: TestClient, ml_profile_pair):
         """Test profile similarity computation with real ML service (if available)."""
-        from app.models.profile import Profile
-        
-        profile1 = Profile(
-            role="investor",
-            full_name="Investor A",
-            email="investor1@test.com",
-            headline="Looking for AI healthcare startups",
-            verification={"soft_verified": False},
-            focus_sectors=["AI", "Healthcare"],
-        )
-        profile2 = Profile(
-            role="founder",
-            full_name="Founder B",
-            email="founder2@test.com",
-            headline="AI healthcare startup",
-            verification={"soft_verified": False},
-            focus_sectors=["AI", "Healthcare"],
-        )
-        db_session.add(profile1)
-        db_session.add(profile2)
-        db_session.commit()
-        db_session.refresh(profile1)
-        db_session.refresh(profile2)
+        investor_id, founder_id = ml_profile_pair
         
         response = client.post(
             "/api/v1/ml/profiles/similarity",
             json={
-                "profile_id_1": profile1.id,
-                "profile_id_2": profile2.id,
+                "profile_id_1": investor_id,
+                "profile_id_2": founder_id,
             },
         )
         
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+from unittest.mock import Mock
+
 import pytest
 from fastapi import status
 
-from app.models.profile import Profile
 from app.schemas.profile import ProfileCreate
+from tests.conftest import build_profile
 
 
 @pytest.mark.unit
@@ -41,19 +43,37 @@ def test_create_profile(client, db_session, sample_investor_profile_data):
     assert "id" in data
 
 
+@pytest.mark.unit
+def test_create_profile_precomputes_embedding(client, db_session, sample_founder_profile_data, monkeypatch):
+    """Test that a new profile is embedded in the background, cached under its id."""
+    embedding_service = Mock()
+    embedding_service.is_available.return_value = True
+    monkeypatch.setattr("app.core.config.settings.ml_enabled", True)
+    monkeypatch.setattr("app.services.ml.embeddings.get_embedding_service", lambda: embedding_service)
+    
+    response = client.post(
+        "/api/v1/profiles",
+        json={
+            "role": "founder",
+            "full_name": sample_founder_profile_data["full_name"],
+            "email": sample_founder_profile_data["email"],
+            "company_name": sample_founder_profile_data["company_name"],
+        },
+    )
+    
+    assert response.status_code == status.HTTP_201_CREATED
+    # TestClient runs background tasks before returning the response
+    embedding_service.embed_profile_np.assert_called_once()
+    profile_data = embedding_service.embed_profile_np.call_args.args[0]
+    assert embedding_service.embed_profile_np.call_args.kwargs["profile_id"] == response.json()["id"]
+    assert profile_data["company_name"] == sample_founder_profile_data["company_name"]
+
+
 @pytest.mark.unit
 def test_get_profile(client, db_session, sample_investor_profile_data):
     """Test getting a profile by ID."""
     # Create a profile first
-    profile_data = sample_investor_profile_data.copy()
-    prompts = profile_data.pop("prompts", [])
-    verification = profile_data.pop("verification", {})
-    
-    profile = Profile(
-        **profile_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+    profile = build_profile(sample_investor_profile_data)
     db_session.add(profile)
     db_session.commit()
     db_session.refresh(profile)
@@ -81,26 +101,10 @@ def test_get_profile_not_found(client):
 def test_list_profiles(client, db_session, sample_investor_profile_data, sample_founder_profile_data):
     """Test listing profiles with optional role filter."""
     # Create profiles
-    investor_data = sample_investor_profile_data.copy()
-    prompts = investor_data.pop("prompts", [])
-    verification = investor_data.pop("verification", {})
-    investor = Profile(
-        **investor_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
-    
-    founder_data = sample_founder_profile_data.copy()
-    prompts = founder_data.pop("prompts", [])
-    verification = founder_data.pop("verification", {})
-    founder = Profile(
-        **founder_data,
-        prompts=[{**p} for p in prompts],
-        verification=verification,
-    )
+    investor = build_profile(sample_investor_profile_data)
+    founder = build_profile(sample_founder_profile_data)
     
-    db_session.add(investor)
-    db_session.add(founder)
+    db_session.add_all([investor, founder])
     db_session.commit()
     
     # List all profiles
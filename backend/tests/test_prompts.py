@@ -78,9 +78,7 @@ def test_list_prompt_templates(client: TestClient, db_session):
         is_active=False,
     )
     
-    db_session.add(template1)
-    db_session.add(template2)
-    db_session.add(template3)
+    db_session.add_all([template1, template2, template3])
     db_session.commit()
     
     # List all active templates
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Generator
+
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -9,21 +11,28 @@ from fastapi.testclient import TestClient
 from app.core.security_middleware import SecurityHeadersMiddleware, InputSanitizationMiddleware
 
 
+@pytest.fixture(scope="module")
+def middleware_client() -> Generator[TestClient, None, None]:
+    """One TestClient for a bare app running both security middlewares."""
+    app = FastAPI()
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(InputSanitizationMiddleware)
+    
+    @app.get("/test")
+    def test_endpoint():
+        return {"message": "test"}
+    
+    with TestClient(app) as client:
+        yield client
+
+
 @pytest.mark.unit
 class TestSecurityHeadersMiddleware:
     """Tests for security headers middleware."""
 
-    def test_security_headers_added(self):
+    def test_security_headers_added(self, middleware_client: TestClient):
         """Test that security headers are added to responses."""
-        app = FastAPI()
-        app.add_middleware(SecurityHeadersMiddleware)
-        
-        @app.get("/test")
-        def test_endpoint():
-            return {"message": "test"}
-        
-        client = TestClient(app)
-        response = client.get("/test")
+        response = middleware_client.get("/test")
         
         assert response.status_code == 200
         assert "X-Content-Type-Options" in response.headers
@@ -39,51 +48,48 @@ class TestSecurityHeadersMiddleware:
 class TestInputSanitizationMiddleware:
     """Tests for input sanitization middleware."""
 
-    def test_sql_injection_detection(self):
-        """Test that SQL injection patterns are detected."""
-        middleware = InputSanitizationMiddleware(None)
-        
-        # Test SQL injection patterns
-        assert middleware._is_suspicious("SELECT * FROM users") is True
-        assert middleware._is_suspicious("DROP TABLE users") is True
-        assert middleware._is_suspicious("'; DROP TABLE--") is True
-        assert middleware._is_suspicious("normal text") is False
+    @pytest.fixture(scope="class")
+    def middleware(self) -> InputSanitizationMiddleware:
+        """One middleware instance shared by the pattern-detection tests."""
+        return InputSanitizationMiddleware(None)
 
-    def test_xss_detection(self):
-        """Test that XSS patterns are detected."""
-        middleware = InputSanitizationMiddleware(None)
-        
-        # Test XSS patterns
-        assert middleware._is_suspicious("<script>alert('xss')</script>") is True
-        assert middleware._is_suspicious("<iframe src='evil.com'></iframe>") is True
-        assert middleware._is_suspicious("javascript:alert('xss')") is True
-        assert middleware._is_suspicious("normal text") is False
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            # SQL injection patterns
+            ("SELECT * FROM users", True),
+            ("DROP TABLE users", True),
+            ("'; DROP TABLE--", True),
+            # XSS patterns
+            ("<script>alert('xss')</script>", True),
+            ("<iframe src='evil.com'></iframe>", True),
+            ("javascript:alert('xss')", True),
+            ("normal text", False),
+            # Length cap: over-limit values are rejected without a scan
+            ("safe " + "a" * 1000, False),
+            ("x" * 100_000, True),
+        ],
+        ids=lambda v: v[:40] if isinstance(v, str) else None,
+    )
+    def test_is_suspicious(self, middleware, value, expected):
+        """Test that SQL injection and XSS patterns are detected, and plain text is not."""
+        assert middleware._is_suspicious(value) is expected
 
-    def test_safe_input_allowed(self):
+    def test_safe_input_allowed(self, middleware_client: TestClient):
         """Test that safe input is allowed."""
-        app = FastAPI()
-        app.add_middleware(InputSanitizationMiddleware)
-        
-        @app.get("/test")
-        def test_endpoint():
-            return {"message": "test"}
-        
-        client = TestClient(app)
-        
         # Safe query param
-        response = client.get("/test?q=hello world")
+        response = middleware_client.get("/test?q=hello world")
         
         assert response.status_code == 200
 
-    def test_sanitize_string(self):
-        """Test string sanitization."""
-        test_cases = [
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
             ("<script>alert('xss')</script>", "&lt;script&gt;alert(&#x27;xss&#x27;)&lt;/script&gt;"),
             ("Hello <b>World</b>", "Hello &lt;b&gt;World&lt;/b&gt;"),
             ("Normal text", "Normal text"),
-        ]
-        
-        for input_str, expected in test_cases:
-            result = InputSanitizationMiddleware.sanitize_string(input_str)
-            assert result == expected
-
+        ],
+    )
+    def test_sanitize_string(self, value, expected):
+        """Test string sanitization."""
+        assert InputSanitizationMiddleware.sanitize_string(value) == expected
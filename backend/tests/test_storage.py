@@ -3,20 +3,35 @@
 from __future__ import annotations
 
 import io
-from unittest.mock import Mock, MagicMock, patch, mock_open
+from typing import Generator
+from unittest.mock import Mock, MagicMock, patch
 from fastapi import status
 from fastapi.testclient import TestClient
 from PIL import Image
 import pytest
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
 
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.models.user import User
 from app.services.storage_service import (
     StorageService,
-    StorageServiceError,
     FileValidationError,
-    storage_service,
 )
 
 
+def _make_jpeg() -> bytes:
+    """Encode a small solid-red JPEG."""
+    img_bytes = io.BytesIO()
+    Image.new('RGB', (100, 100), color='red').save(img_bytes, format='JPEG')
+    return img_bytes.getvalue()
+
+
+# Encoded once at import; the tests only need valid image bytes, not a fresh encode
+_JPEG_BYTES = _make_jpeg()
+
+
 @pytest.mark.unit
 class TestStorageService:
     """Unit tests for StorageService."""
@@ -33,8 +48,8 @@ class TestStorageService:
         service = StorageService()
         service.client = Mock()  # Mock client to make service "available"
         
-        # Create file content larger than default limit (10MB)
-        large_content = b'x' * (11 * 1024 * 1024)  # 11 MB
+        # One byte over the configured limit; bytes(n) is a single zeroed allocation
+        large_content = bytes(settings.max_file_size_mb * 1024 * 1024 + 1)
         
         with pytest.raises(FileValidationError) as exc_info:
             service.validate_file(
@@ -77,14 +92,8 @@ class TestStorageService:
         service.client = Mock()
         service.bucket_name = "test-bucket"
         
-        # Create a simple image
-        img = Image.new('RGB', (100, 100), color='red')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        img_bytes.seek(0)
-        
         content_type, ext = service.validate_file(
-            file_content=img_bytes.read(),
+            file_content=_JPEG_BYTES,
             filename="test.jpg",
         )
         
@@ -132,67 +141,79 @@ class TestStorageService:
 
     @patch('app.services.storage_service.Image')
     def test_optimize_image(self, mock_image):
-        """Test image optimization."""
+        """Test that an oversized image is downscaled and re-encoded."""
         service = StorageService()
         
-        # Create mock image
+        # Oversized JPEG whose save writes a known payload into the output buffer
         mock_img = Mock()
         mock_img.format = 'JPEG'
         mock_img.mode = 'RGB'
         mock_img.width = 3000
         mock_img.height = 2000
-        mock_img.thumbnail = Mock()
-        
-        mock_image.open.return_value.__enter__.return_value = mock_img
+        mock_img.save.side_effect = lambda buf, **kwargs: buf.write(b"opt")
         
-        # Mock save
-        output = io.BytesIO()
-        mock_img.save = Mock()
+        mock_image.open.return_value = mock_img
         
-        file_content = b'fake image content'
+        result = service.optimize_image(b'fake image content')
         
-        result = service.optimize_image(file_content)
-        
-        # Image should be processed
-        assert mock_img.thumbnail.called or mock_img.save.called or result == file_content
+        mock_img.thumbnail.assert_called_once()
+        mock_img.save.assert_called_once()
+        assert result == b"opt"
+
+
+@pytest.fixture(scope="module")
+def storage_user(db_connection: Connection) -> Generator[tuple[str, str], None, None]:
+    """Insert one founder user for the module and mint its access token.
+    
+    Skips the signup/login round trip (and its bcrypt hashes) in every
+    endpoint test. The row lives in a SAVEPOINT rolled back with the module.
+    """
+    savepoint = db_connection.begin_nested()
+    session = Session(bind=db_connection, join_transaction_mode="create_savepoint")
+    user = User(email="test@example.com")
+    session.add(user)
+    session.commit()
+    user_id = user.id
+    session.close()
+    token = create_access_token({"sub": user_id, "email": "test@example.com", "is_admin": False})
+    
+    yield user_id, token
+    
+    savepoint.rollback()
+
+
+@pytest.fixture
+def mock_storage_service(monkeypatch) -> MagicMock:
+    """Route the storage endpoints to a fresh StorageService mock that reports itself available.
+    
+    Built per test rather than copied from a shared template: a shallow copy
+    shares its child mocks, so return values and call counts would leak
+    between tests.
+    """
+    service = MagicMock(spec=StorageService)
+    service.is_available.return_value = True
+    monkeypatch.setattr("app.api.v1.endpoints.storage.storage_service", service)
+    return service
 
 
 @pytest.mark.integration
 class TestStorageEndpoints:
     """Integration tests for storage endpoints."""
 
-    def test_upload_profile_photo_storage_unavailable(self, client: TestClient, db_session):
+    def test_upload_profile_photo_storage_unavailable(self, client: TestClient, mock_storage_service, storage_user):
         """Test upload when storage is unavailable."""
-        # Mock storage service as unavailable
-        with patch('app.api.v1.endpoints.storage.storage_service.is_available', return_value=False):
-            # Create user first
-            client.post(
-                "/api/v1/auth/signup",
-                json={
-                    "email": "test@example.com",
-                    "password": "SecurePass123!",
-                    "role": "founder",
-                    "full_name": "Test User",
-                },
-            )
-            
-            login_response = client.post(
-                "/api/v1/auth/login",
-                json={
-                    "email": "test@example.com",
-                    "password": "SecurePass123!",
-                },
-            )
-            token = login_response.json()["access_token"]
-            
-            # Try to upload file
-            response = client.post(
-                "/api/v1/storage/upload/profile-photo",
-                headers={"Authorization": f"Bearer {token}"},
-                files={"file": ("photo.jpg", b"fake image content", "image/jpeg")},
-            )
-            
-            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        mock_storage_service.is_available.return_value = False
+        
+        _, token = storage_user
+        
+        # Try to upload file
+        response = client.post(
+            "/api/v1/storage/upload/profile-photo",
+            headers={"Authorization": f"Bearer {token}"},
+            files={"file": ("photo.jpg", b"fake image content", "image/jpeg")},
+        )
+        
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
 
     def test_upload_profile_photo_unauthorized(self, client: TestClient):
         """Test upload without authentication."""
@@ -203,47 +224,21 @@ class TestStorageEndpoints:
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-    @patch('app.api.v1.endpoints.storage.storage_service')
-    def test_upload_profile_photo_success(self, mock_storage_service, client: TestClient, db_session):
+    def test_upload_profile_photo_success(self, client: TestClient, mock_storage_service, storage_user):
         """Test successful profile photo upload."""
         # Setup mocks
-        mock_storage_service.is_available.return_value = True
         mock_storage_service.validate_file.return_value = ("image/jpeg", ".jpg")
         mock_storage_service.optimize_image.return_value = b"optimized content"
         mock_storage_service.generate_file_path.return_value = "profile-photos/user-123/file.jpg"
         mock_storage_service.upload_file.return_value = "http://example.com/file.jpg"
         
-        # Create user and login
-        client.post(
-            "/api/v1/auth/signup",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-                "role": "founder",
-                "full_name": "Test User",
-            },
-        )
-        
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-            },
-        )
-        token = login_response.json()["access_token"]
-        
-        # Create a simple image file
-        img = Image.new('RGB', (100, 100), color='red')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        img_bytes.seek(0)
+        _, token = storage_user
         
         # Upload file
         response = client.post(
             "/api/v1/storage/upload/profile-photo",
             headers={"Authorization": f"Bearer {token}"},
-            files={"file": ("photo.jpg", img_bytes.read(), "image/jpeg")},
+            files={"file": ("photo.jpg", _JPEG_BYTES, "image/jpeg")},
         )
         
         assert response.status_code == status.HTTP_201_CREATED
@@ -252,31 +247,11 @@ class TestStorageEndpoints:
         assert "file_path" in data
         assert "content_type" in data
 
-    @patch('app.api.v1.endpoints.storage.storage_service')
-    def test_upload_file_validation_error(self, mock_storage_service, client: TestClient, db_session):
+    def test_upload_file_validation_error(self, client: TestClient, mock_storage_service, storage_user):
         """Test upload with validation error."""
-        mock_storage_service.is_available.return_value = True
         mock_storage_service.validate_file.side_effect = FileValidationError("File too large")
         
-        # Create user and login
-        client.post(
-            "/api/v1/auth/signup",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-                "role": "founder",
-                "full_name": "Test User",
-            },
-        )
-        
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-            },
-        )
-        token = login_response.json()["access_token"]
+        _, token = storage_user
         
         # Try to upload invalid file
         response = client.post(
@@ -287,31 +262,11 @@ class TestStorageEndpoints:
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-    @patch('app.api.v1.endpoints.storage.storage_service')
-    def test_generate_signed_url(self, mock_storage_service, client: TestClient, db_session):
+    def test_generate_signed_url(self, client: TestClient, mock_storage_service, storage_user):
         """Test signed URL generation."""
-        mock_storage_service.is_available.return_value = True
         mock_storage_service.generate_signed_url.return_value = "https://example.com/signed-url?signature=xxx"
         
-        # Create user and login
-        client.post(
-            "/api/v1/auth/signup",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-                "role": "founder",
-                "full_name": "Test User",
-            },
-        )
-        
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-            },
-        )
-        token = login_response.json()["access_token"]
+        _, token = storage_user
         
         # Generate signed URL
         response = client.post(
@@ -328,30 +283,9 @@ class TestStorageEndpoints:
         assert "signed_url" in data
         assert "expires_in_seconds" in data
 
-    @patch('app.api.v1.endpoints.storage.storage_service')
-    def test_delete_file_unauthorized_path(self, mock_storage_service, client: TestClient, db_session):
+    def test_delete_file_unauthorized_path(self, client: TestClient, mock_storage_service, storage_user):
         """Test deleting file from unauthorized path."""
-        mock_storage_service.is_available.return_value = True
-        
-        # Create user and login
-        client.post(
-            "/api/v1/auth/signup",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-                "role": "founder",
-                "full_name": "Test User",
-            },
-        )
-        
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-            },
-        )
-        token = login_response.json()["access_token"]
+        _, token = storage_user
         
         # Try to delete file from another user's path
         response = client.delete(
@@ -361,32 +295,11 @@ class TestStorageEndpoints:
         
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
-    @patch('app.api.v1.endpoints.storage.storage_service')
-    def test_delete_file_success(self, mock_storage_service, client: TestClient, db_session):
+    def test_delete_file_success(self, client: TestClient, mock_storage_service, storage_user):
         """Test successful file deletion."""
-        mock_storage_service.is_available.return_value = True
         mock_storage_service.delete_file.return_value = True
         
-        # Create user and login
-        signup_response = client.post(
-            "/api/v1/auth/signup",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-                "role": "founder",
-                "full_name": "Test User",
-            },
-        )
-        user_id = signup_response.json()["id"]
-        
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-            },
-        )
-        token = login_response.json()["access_token"]
+        user_id, token = storage_user
         
         # Delete file
         file_path = f"profile-photos/{user_id}/file.jpg"